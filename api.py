@@ -2,14 +2,28 @@
 Devon Agent API Server
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from flask import Flask, Response, request
 import asyncio
+import hashlib
+import json
 import logging
 from typing import Dict, Any
 import os
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional speedup
+    uvloop = None
 
 from devon_agent import DevonAgent
+from devon_agent.code_generator import CodeGenerator
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,7 +31,87 @@ logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)
+
+# CORS headers attached to every response
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': os.getenv('CORS_ORIGIN', '*'),
+    'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization'
+}
+
+
+@app.before_request
+def _cors_preflight():
+    """Answer CORS preflight requests without dispatching to a view"""
+    if request.method == 'OPTIONS':
+        return Response(status=204)
+
+
+@app.after_request
+def _cors_headers(response: Response) -> Response:
+    """Attach CORS headers to the response"""
+    response.headers.update(_CORS_HEADERS)
+    return response
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize an object to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Deserialize JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def ojsonify(obj: Any, status: int = 200) -> Response:
+    """Build a JSON response, using orjson when available"""
+    return Response(_dumps(obj), status=status, mimetype='application/json')
+
+
+def compute_etag(body: bytes) -> str:
+    """Compute a short content hash for use as an ETag"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def conditional_json_response(body: bytes, etag: str = None) -> Response:
+    """Build a JSON response with an ETag, answering 304 when the client has it"""
+    etag = etag or compute_etag(body)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    return response
+
+
+def get_request_json() -> Any:
+    """Parse the request body as JSON, returning None when empty"""
+    data = request.get_data(cache=False)
+    if not data:
+        return None
+    return _loads(data)
+
+
+def _start_event_loop() -> asyncio.AbstractEventLoop:
+    """Start a persistent event loop on a background daemon thread"""
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="devon-event-loop", daemon=True)
+    thread.start()
+    return loop
+
+
+# Shared event loop used to run agent coroutines from request threads
+_loop = _start_event_loop()
+
+
+def run_async(coro) -> Any:
+    """Run a coroutine on the shared event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
 
 # Initialize Devon Agent
 agent = DevonAgent(
@@ -25,185 +119,269 @@ agent = DevonAgent(
     workspace_path=os.getenv("WORKSPACE_PATH", "./workspace")
 )
 
+# Health payload never changes while the process runs
+_HEALTH_BODY = _dumps({
+    "status": "healthy",
+    "agent": "Devon",
+    "version": "0.1.0"
+})
+_HEALTH_ETAG = compute_etag(_HEALTH_BODY)
+
+# Code generator backing the raw generation endpoint
+code_generator = CodeGenerator()
+
+# Serialized /api/tools payload as (timestamp, body, etag), refreshed after the TTL
+TOOLS_CACHE_TTL = float(os.getenv("TOOLS_CACHE_TTL", "30"))
+_tools_cache = None
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        "status": "healthy",
-        "agent": "Devon",
-        "version": "0.1.0"
-    })
+    response = conditional_json_response(_HEALTH_BODY, _HEALTH_ETAG)
+    response.headers['Cache-Control'] = 'public, max-age=10'
+    return response
 
 @app.route('/api/agent/status', methods=['GET'])
 def get_agent_status():
     """Get current agent status"""
     try:
         state = agent.get_state()
-        return jsonify({
+        return ojsonify({
             "success": True,
             "state": state
         })
     except Exception as e:
-        logger.error(f"Error getting agent status: {e}")
-        return jsonify({
+        logger.error("Error getting agent status: %s", e, exc_info=True)
+        return ojsonify({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/agent/execute', methods=['POST'])
 def execute_task():
     """Execute a task with the agent"""
     try:
-        data = request.json
+        data = get_request_json()
         if not data or 'request' not in data:
-            return jsonify({
+            return ojsonify({
                 "success": False,
                 "error": "Missing 'request' in body"
-            }), 400
+            }, 400)
         
         user_request = data['request']
         
-        # Run async function in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(
-            agent.process_request(user_request)
-        )
-        loop.close()
+        # Run async function on the shared event loop
+        result = run_async(agent.process_request(user_request))
         
-        return jsonify(result)
+        return ojsonify(result)
         
     except Exception as e:
-        logger.error(f"Error executing task: {e}")
-        return jsonify({
+        logger.error("Error executing task: %s", e, exc_info=True)
+        return ojsonify({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
+
+async def _process_batch(user_requests):
+    """Process several requests concurrently on the agent"""
+    return await asyncio.gather(
+        *(agent.process_request(user_request) for user_request in user_requests)
+    )
+
+@app.route('/api/agent/execute_batch', methods=['POST'])
+def execute_batch():
+    """Execute several tasks with the agent in one call"""
+    try:
+        data = get_request_json()
+        if not data or not isinstance(data.get('requests'), list):
+            return ojsonify({
+                "success": False,
+                "error": "Missing 'requests' list in body"
+            }, 400)
+        
+        # Run all requests concurrently on the shared event loop
+        results = run_async(_process_batch(data['requests']))
+        
+        return ojsonify({
+            "success": True,
+            "results": results
+        })
+        
+    except Exception as e:
+        logger.error("Error executing batch: %s", e, exc_info=True)
+        return ojsonify({
+            "success": False,
+            "error": str(e)
+        }, 500)
 
 @app.route('/api/agent/reset', methods=['POST'])
 def reset_agent():
     """Reset agent state"""
+    global _tools_cache
     try:
         agent.reset()
-        return jsonify({
+        _tools_cache = None
+        return ojsonify({
             "success": True,
             "message": "Agent state reset successfully"
         })
     except Exception as e:
-        logger.error(f"Error resetting agent: {e}")
-        return jsonify({
+        logger.error("Error resetting agent: %s", e, exc_info=True)
+        return ojsonify({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/agent/memory', methods=['GET'])
 def get_memory():
     """Get agent memory summary"""
     try:
-        summary = agent.memory.summarize_session()
-        recent = agent.memory.get_recent_context(5)
+        # Splice the memory's cached JSON into the envelope without re-encoding
+        body = b''.join((
+            b'{"success":true,"summary":',
+            agent.memory.summarize_session_json(),
+            b',"recent_context":',
+            agent.memory.get_recent_context_json(5),
+            b'}'
+        ))
         
-        return jsonify({
-            "success": True,
-            "summary": summary,
-            "recent_context": recent
-        })
+        return conditional_json_response(body)
     except Exception as e:
-        logger.error(f"Error getting memory: {e}")
-        return jsonify({
+        logger.error("Error getting memory: %s", e, exc_info=True)
+        return ojsonify({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/agent/memory/search', methods=['POST'])
 def search_memory():
     """Search agent memory"""
     try:
-        data = request.json
+        data = get_request_json()
         query = data.get('query', '')
         memory_type = data.get('type', 'all')
         
         results = agent.memory.search_memory(query, memory_type)
         
-        return jsonify({
+        return ojsonify({
             "success": True,
             "results": results
         })
     except Exception as e:
-        logger.error(f"Error searching memory: {e}")
-        return jsonify({
+        logger.error("Error searching memory: %s", e, exc_info=True)
+        return ojsonify({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/tools', methods=['GET'])
 def list_tools():
     """List available tools"""
+    global _tools_cache
     try:
-        tools = agent.tools.list_tools()
-        return jsonify({
+        cached = _tools_cache
+        if cached is not None and time.monotonic() - cached[0] < TOOLS_CACHE_TTL:
+            return conditional_json_response(cached[1], cached[2])
+        
+        body = _dumps({
             "success": True,
-            "tools": tools
+            "tools": agent.tools.list_tools()
         })
+        etag = compute_etag(body)
+        _tools_cache = (time.monotonic(), body, etag)
+        return conditional_json_response(body, etag)
     except Exception as e:
-        logger.error(f"Error listing tools: {e}")
-        return jsonify({
+        logger.error("Error listing tools: %s", e, exc_info=True)
+        return ojsonify({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/tools/execute', methods=['POST'])
 def execute_tool():
     """Execute a specific tool"""
     try:
-        data = request.json
+        data = get_request_json()
         tool_name = data.get('tool')
         params = data.get('params', {})
         
         if not tool_name:
-            return jsonify({
+            return ojsonify({
                 "success": False,
                 "error": "Missing 'tool' in body"
-            }), 400
+            }, 400)
+        
+        # Run async function on the shared event loop
+        result = run_async(agent.tools.execute_tool(tool_name, **params))
+        
+        return ojsonify(result)
+        
+    except Exception as e:
+        logger.error("Error executing tool: %s", e, exc_info=True)
+        return ojsonify({
+            "success": False,
+            "error": str(e)
+        }, 500)
+
+@app.route('/api/generate/raw', methods=['POST'])
+def generate_raw():
+    """Return generated source code as plain text"""
+    try:
+        data = get_request_json()
+        if not data or 'description' not in data:
+            return ojsonify({
+                "success": False,
+                "error": "Missing 'description' in body"
+            }, 400)
         
-        # Run async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(
-            agent.tools.execute_tool(tool_name, **params)
+        code = code_generator.generate_code(
+            data['description'],
+            language=data.get('language', 'python'),
+            code_type=data.get('type', 'function')
         )
-        loop.close()
         
-        return jsonify(result)
+        return Response(code, mimetype='text/plain')
         
     except Exception as e:
-        logger.error(f"Error executing tool: {e}")
-        return jsonify({
+        logger.error("Error generating code: %s", e, exc_info=True)
+        return ojsonify({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
-    return jsonify({
+    return ojsonify({
         "success": False,
         "error": "Endpoint not found"
-    }), 404
+    }, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
-    return jsonify({
+    return ojsonify({
         "success": False,
         "error": "Internal server error"
-    }), 500
+    }, 500)
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
-    app.run(
-        debug=os.getenv('DEBUG', 'False').lower() == 'true',
-        host='0.0.0.0',
-        port=port
-    )
-    logger.info(f"Devon Agent API running on port {port}")
\ No newline at end of file
+    debug = os.getenv('DEBUG', 'False').lower() == 'true'
+    threads = int(os.getenv('THREADS', 16))
+    logger.info("Devon Agent API running on port %s", port)
+    
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+    
+    if serve is None or debug:
+        app.run(
+            debug=debug,
+            host='0.0.0.0',
+            port=port,
+            threaded=True
+        )
+    else:
+        serve(app, host='0.0.0.0', port=port, threads=threads)
@@ -9,5 +9,7 @@ from .core import DevonAgent
 from .planner import TaskPlanner
 from .executor import CodeExecutor
 from .memory import MemoryManager
+from .cache import ResponseCache, PlanTemplateCache
 
-__all__ = ["DevonAgent", "TaskPlanner", "CodeExecutor", "MemoryManager"]
\ No newline at end of file
+__all__ = ["DevonAgent", "TaskPlanner", "CodeExecutor", "MemoryManager", "ResponseCache",
+           "PlanTemplateCache"]
\ No newline at end of file
@@ -0,0 +1,309 @@
+"""
+Response Caching Module for Devon Agent
+"""
+
+from typing import Dict, Any, Optional, List, Tuple, FrozenSet
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Exact-match cache for model responses such as task plans
+    
+    Entries are keyed on a hash of the model, the normalized prompt and the
+    context. Values must be JSON serializable and are stored encoded, so every
+    lookup returns a fresh copy that callers are free to mutate.
+    """
+    
+    def __init__(self, max_size: int = 1024, persistence_path: Optional[str] = None):
+        """
+        Initialize the response cache
+        
+        Args:
+            max_size: Maximum number of entries kept in memory
+            persistence_path: Optional SQLite file used as a persistent second tier
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        
+        if persistence_path:
+            path = Path(persistence_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+    
+    @staticmethod
+    def make_key(model: str, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build a cache key from the model, prompt and context
+        """
+        normalized = " ".join(prompt.lower().split())
+        context_json = json.dumps(context or {}, sort_keys=True, default=str)
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (model, normalized, context_json):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached value, returning None on a miss
+        """
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    encoded = row[0]
+                    self._store(key, encoded)
+            
+            if encoded is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        
+        return json.loads(encoded)
+    
+    def put(self, key: str, value: Any):
+        """
+        Store a value in the cache
+        """
+        encoded = json.dumps(value, default=str)
+        with self._lock:
+            self._store(key, encoded)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value) VALUES (?, ?)",
+                    (key, encoded)
+                )
+                self._db.commit()
+    
+    def _store(self, key: str, encoded: str):
+        """Insert into the in-memory tier, evicting the least recently used entry"""
+        self._entries[key] = encoded
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """
+        Remove all cached entries
+        """
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+            self.hits = 0
+            self.misses = 0
+
+
+_KEYWORD_RE = re.compile(r"[a-z][a-z0-9_]+")
+# Variable parts of a request: file paths, then defined function/class names
+_VARIABLE_RES = (
+    re.compile(r'[./\\]?[\w./\\-]+\.\w+'),
+    re.compile(r'(?:def|class|function|method)\s+(\w+)'),
+)
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from",
+    "in", "into", "is", "it", "its", "me", "my", "of", "on", "or", "our", "please",
+    "so", "that", "the", "this", "to", "we", "with", "you", "your"
+})
+
+
+class PlanTemplateCache:
+    """
+    Similarity cache of plan templates for requests with recurring intent
+    
+    A stored plan has the request's variable parts (file paths and named
+    functions/classes) replaced by numbered placeholders. A new request whose
+    keyword set has a Jaccard similarity of at least `threshold` with a stored
+    template, and the same number of variables, reuses that template with its
+    own variables filled in.
+    """
+    
+    def __init__(self, max_size: int = 1000, threshold: float = 0.6,
+                 persistence_path: Optional[str] = None):
+        """
+        Initialize the template cache
+        
+        Args:
+            max_size: Maximum number of templates kept (least recently used evicted)
+            threshold: Minimum keyword Jaccard similarity for a template match
+            persistence_path: Optional JSON file the templates are kept in
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self.persistence_path = Path(persistence_path) if persistence_path else None
+        # (frozen keyword set, complexity) -> plan template
+        self._templates: "OrderedDict[Tuple[FrozenSet[str], Optional[str]], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        if self.persistence_path and self.persistence_path.exists():
+            try:
+                for keywords, complexity, template in json.loads(self.persistence_path.read_text()):
+                    self._templates[(frozenset(keywords), complexity)] = template
+            except (OSError, ValueError) as e:
+                logger.error("Failed to load plan templates: %s", e)
+    
+    @staticmethod
+    def extract_variables(request: str) -> List[str]:
+        """
+        Extract the variable parts of a request in order of first appearance
+        """
+        found = []
+        for pattern in _VARIABLE_RES:
+            for match in pattern.finditer(request):
+                value = match.group(match.lastindex or 0)
+                found.append((match.start(), value))
+        
+        variables = []
+        for _, value in sorted(found):
+            if value not in variables:
+                variables.append(value)
+        return variables
+    
+    @staticmethod
+    def extract_keywords(request: str, variables: List[str]) -> FrozenSet[str]:
+        """
+        Extract the intent keywords of a request, ignoring its variables
+        """
+        text = request
+        if variables:
+            text = PlanTemplateCache._token_pattern(variables).sub(" ", text)
+        return frozenset(
+            word for word in _KEYWORD_RE.findall(text.lower()) if word not in _STOPWORDS
+        )
+    
+    @staticmethod
+    def _placeholder(index: int) -> str:
+        return f"<<var{index}>>"
+    
+    @staticmethod
+    def _token_pattern(values: List[str]) -> "re.Pattern":
+        """
+        Match any of the values as a whole token, never inside a longer word
+        
+        Longer values are tried first so a path is not split by a name inside it.
+        """
+        alternatives = "|".join(re.escape(value) for value in sorted(values, key=len, reverse=True))
+        return re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)")
+    
+    @classmethod
+    def _substitute(cls, value: Any, replacements: Dict[str, str]) -> Any:
+        """Replace whole-token occurrences in every string inside a JSON-like value"""
+        if not replacements:
+            return value
+        return cls._substitute_with(value, cls._token_pattern(list(replacements)), replacements)
+    
+    @classmethod
+    def _substitute_with(cls, value: Any, pattern: "re.Pattern", replacements: Dict[str, str]) -> Any:
+        if isinstance(value, str):
+            return pattern.sub(lambda match: replacements[match.group(0)], value)
+        if isinstance(value, dict):
+            return {
+                cls._substitute_with(k, pattern, replacements): cls._substitute_with(v, pattern, replacements)
+                for k, v in value.items()
+            }
+        if isinstance(value, list):
+            return [cls._substitute_with(item, pattern, replacements) for item in value]
+        return value
+    
+    def get(self, request: str, complexity: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find a template similar to the request and fill it with the request's variables
+        
+        Args:
+            request: The user's request
+            complexity: Only templates recorded for this complexity are considered
+        
+        Returns:
+            The filled plan, or None if no template is similar enough
+        """
+        variables = self.extract_variables(request)
+        keywords = self.extract_keywords(request, variables)
+        
+        with self._lock:
+            best_key = None
+            best_score = self.threshold
+            for key, template in self._templates.items():
+                template_keywords, template_complexity = key
+                if template_complexity != complexity or template["variable_count"] != len(variables):
+                    continue
+                union = len(keywords | template_keywords)
+                score = len(keywords & template_keywords) / union if union else 1.0
+                if score >= best_score:
+                    best_key, best_score = key, score
+            
+            if best_key is None:
+                self.misses += 1
+                return None
+            self._templates.move_to_end(best_key)
+            self.hits += 1
+            plan = self._templates[best_key]["plan"]
+        
+        replacements = {self._placeholder(i): value for i, value in enumerate(variables)}
+        return self._substitute(plan, replacements)
+    
+    def put(self, request: str, plan: Dict[str, Any], complexity: Optional[str] = None):
+        """
+        Store a plan as a template for the request's intent
+        """
+        variables = self.extract_variables(request)
+        keywords = self.extract_keywords(request, variables)
+        replacements = {value: self._placeholder(i) for i, value in enumerate(variables)}
+        template = {
+            "variable_count": len(variables),
+            "plan": self._substitute(plan, replacements)
+        }
+        
+        with self._lock:
+            key = (keywords, complexity)
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            if len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+            if self.persistence_path:
+                self._save()
+    
+    def _save(self):
+        """Write the templates to the persistence file"""
+        data = [
+            [sorted(keywords), complexity, template]
+            for (keywords, complexity), template in self._templates.items()
+        ]
+        self.persistence_path.parent.mkdir(parents=True, exist_ok=True)
+        self.persistence_path.write_text(json.dumps(data))
+    
+    def clear(self):
+        """
+        Remove all templates
+        """
+        with self._lock:
+            self._templates.clear()
+            if self.persistence_path:
+                self._save()
+            self.hits = 0
+            self.misses = 0
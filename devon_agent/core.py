@@ -3,11 +3,14 @@ Core Devon Agent Implementation
 """
 
 import asyncio
-from typing import Dict, List, Any, Optional
+import sys
+from array import array
+from typing import Dict, List, Any, Optional, Tuple, Iterable
 from dataclasses import dataclass
 import logging
 
-from .planner import TaskPlanner
+from .cache import ResponseCache, PlanTemplateCache
+from .planner import TaskPlanner, TaskPlan
 from .executor import CodeExecutor
 from .memory import MemoryManager
 from .tools import ToolManager
@@ -15,21 +18,94 @@ from .tools import ToolManager
 logger = logging.getLogger(__name__)
 
 
+# Task statuses stored in TaskTable.status
+PENDING, RUNNING, DONE, FAILED = range(4)
+
+
+class TaskTable:
+    """
+    Column-oriented table of every task the agent has planned
+    
+    Task labels (interned) and one status byte per task are kept in parallel
+    columns, so status transitions are single byte writes instead of list
+    mutations. Only the tasks of the current plan can be pending.
+    """
+    
+    __slots__ = ("labels", "status", "finished", "plan_start")
+    
+    def __init__(self):
+        self.labels: List[str] = []
+        self.status = array("B")
+        # Task indices in the order they finished
+        self.finished = array("l")
+        # Index of the first task of the current plan
+        self.plan_start = 0
+    
+    def start_plan(self, tasks: Iterable[str]) -> int:
+        """
+        Append a new plan's tasks and make it the current plan
+        
+        Returns:
+            Index of the plan's first task
+        """
+        self.plan_start = len(self.labels)
+        for task in tasks:
+            self.labels.append(sys.intern(task))
+            self.status.append(PENDING)
+        return self.plan_start
+    
+    def set_status(self, idx: int, status: int):
+        """
+        Set a task's status, recording it as finished when it reaches DONE or FAILED
+        """
+        self.status[idx] = status
+        if status >= DONE:
+            self.finished.append(idx)
+    
+    def count(self, status: int) -> int:
+        """
+        Count tasks of the current plan with the given status
+        """
+        return self.status[self.plan_start:].count(status)
+    
+    def completed(self) -> List[str]:
+        """
+        Labels of finished tasks, in the order they finished
+        """
+        labels = self.labels
+        return [labels[idx] for idx in self.finished]
+    
+    def pending(self) -> List[str]:
+        """
+        Labels of the current plan's tasks that have not started
+        """
+        labels = self.labels
+        status = self.status
+        return [labels[idx] for idx in range(self.plan_start, len(labels)) if status[idx] == PENDING]
+
+
 @dataclass
 class AgentState:
     """Represents the current state of the Devon agent"""
     current_task: Optional[str] = None
-    completed_tasks: List[str] = None
-    pending_tasks: List[str] = None
+    tasks: TaskTable = None
     context: Dict[str, Any] = None
     
     def __post_init__(self):
-        if self.completed_tasks is None:
-            self.completed_tasks = []
-        if self.pending_tasks is None:
-            self.pending_tasks = []
+        if self.tasks is None:
+            self.tasks = TaskTable()
         if self.context is None:
             self.context = {}
+    
+    @property
+    def completed_tasks(self) -> List[str]:
+        """Tasks finished so far, in completion order"""
+        return self.tasks.completed()
+    
+    @property
+    def pending_tasks(self) -> List[str]:
+        """Tasks of the current plan that have not started"""
+        return self.tasks.pending()
 
 
 class DevonAgent:
@@ -37,23 +113,37 @@ class DevonAgent:
     Main Devon Agent class that coordinates planning, execution, and memory
     """
     
-    def __init__(self, model: str = "gpt-4", workspace_path: str = "./workspace"):
+    def __init__(self, model: str = "gpt-4", workspace_path: str = "./workspace",
+                 plan_cache_path: Optional[str] = None, max_concurrent_tasks: int = 8,
+                 reuse_similar_plans: bool = False):
         """
         Initialize the Devon agent
         
         Args:
             model: The LLM model to use for reasoning
             workspace_path: Path to the working directory
+            plan_cache_path: Optional SQLite file for persisting cached plans
+            max_concurrent_tasks: Maximum number of plan tasks executed at once
+            reuse_similar_plans: Adapt plans of similar earlier requests instead of re-planning
         """
         self.model = model
+        self.max_concurrent_tasks = max_concurrent_tasks
         self.workspace_path = workspace_path
         self.state = AgentState()
         
         # Initialize components
-        self.planner = TaskPlanner(model=model)
+        self.tools = ToolManager(workspace_path=workspace_path)
+        self.plan_cache = ResponseCache(persistence_path=plan_cache_path)
+        self.plan_templates = PlanTemplateCache() if reuse_similar_plans else None
+        # Tool definitions are part of the planner's fixed prompt prefix
+        self.planner = TaskPlanner(
+            model=model,
+            cache=self.plan_cache,
+            tool_specs=self.tools.list_tools(),
+            template_cache=self.plan_templates
+        )
         self.executor = CodeExecutor(workspace_path=workspace_path)
         self.memory = MemoryManager()
-        self.tools = ToolManager(workspace_path=workspace_path)
         
         logger.info(f"Devon Agent initialized with model: {model}")
     
@@ -63,12 +153,13 @@ class DevonAgent:
         
         Args:
             user_request: The natural language request from the user
-            
+        
         Returns:
             A dictionary containing the result and any artifacts
         """
         logger.info(f"Processing request: {user_request[:100]}...")
         
+        table = self.state.tasks
         try:
             # Store the request in memory
             self.memory.add_interaction("user", user_request)
@@ -78,41 +169,50 @@ class DevonAgent:
                 user_request, 
                 context=self.state.context
             )
-            self.state.pending_tasks = plan.tasks
+            # This request's rows in the task table start at base
+            base = table.start_plan(plan.tasks)
+            
+            # Execute the plan in dependency waves; tasks within a wave run concurrently
+            depends_on = self._task_dependencies(plan)
+            semaphore = asyncio.Semaphore(self.max_concurrent_tasks)
+            results = [None] * len(plan.tasks)
+            done = set()
+            remaining = list(range(len(plan.tasks)))
             
-            # Execute each task in the plan
-            results = []
-            for task in plan.tasks:
-                self.state.current_task = task
-                logger.info(f"Executing task: {task}")
+            while remaining:
+                ready = [i for i in remaining if all(d in done for d in depends_on[i])]
+                if not ready:
+                    # Unsatisfiable dependencies; fall back to plan order
+                    ready = remaining[:1]
                 
-                # Execute the task
-                result = await self.executor.execute_task(
-                    task,
-                    context=self.state.context,
-                    memory=self.memory
-                )
+                for i in ready:
+                    table.status[base + i] = RUNNING
+                wave_results = await asyncio.gather(*(
+                    self._execute_task(plan.tasks[i], semaphore) for i in ready
+                ))
                 
-                # Update state
-                self.state.completed_tasks.append(task)
-                self.state.pending_tasks.remove(task)
-                self.state.context.update(result.get("context", {}))
+                # Merge results in plan order to keep state deterministic
+                for i, result in zip(ready, wave_results):
+                    task = plan.tasks[i]
+                    table.set_status(base + i, DONE if result.get("success") else FAILED)
+                    self.state.context.update(result.get("context", {}))
+                    results[i] = result
+                    done.add(i)
+                    self.memory.add_interaction("assistant", f"Completed: {task}")
                 
-                # Store result
-                results.append(result)
-                self.memory.add_interaction("assistant", f"Completed: {task}")
+                remaining = [i for i in remaining if i not in done]
             
             # Generate final response
-            response = self._synthesize_response(results)
+            response, artifacts = self._finalize(results)
             self.memory.add_interaction("assistant", response["summary"])
             
             return {
                 "success": True,
                 "response": response,
                 "tasks_completed": self.state.completed_tasks,
-                "artifacts": self._collect_artifacts(results)
+                "artifacts": artifacts
             }
-            
+        
         except Exception as e:
             logger.error(f"Error processing request: {e}")
             return {
@@ -121,44 +221,71 @@ class DevonAgent:
                 "tasks_completed": self.state.completed_tasks
             }
     
-    def _synthesize_response(self, results: List[Dict]) -> Dict[str, Any]:
+    async def _execute_task(self, task: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """
+        Execute a single task, bounded by the concurrency semaphore
         """
-        Synthesize a final response from task results
+        async with semaphore:
+            self.state.current_task = task
+            logger.info(f"Executing task: {task}")
+            
+            return await self.executor.execute_task(
+                task,
+                context=self.state.context,
+                memory=self.memory
+            )
+    
+    @staticmethod
+    def _task_dependencies(plan: TaskPlan) -> List[List[int]]:
+        """
+        Map the plan's task dependencies to indices of earlier tasks
+        """
+        deps = plan.deps
+        return [
+            [d for d in deps[i] if 0 <= d < i] if i < len(deps) else []
+            for i in range(len(plan.tasks))
+        ]
+    
+    def _finalize(self, results: List[Dict]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Synthesize the final response and collect artifacts in a single pass
         """
         summary_parts = []
         code_changes = []
+        files_created = []
+        files_modified = []
+        commands_executed = []
+        errors = []
+        successful = 0
         
         for result in results:
             if result.get("success"):
+                successful += 1
                 summary_parts.append(result.get("summary", "Task completed"))
                 if "code_changes" in result:
                     code_changes.extend(result["code_changes"])
+            
+            result_artifacts = result.get("artifacts")
+            if result_artifacts:
+                files_created.extend(result_artifacts.get("files_created", ()))
+                files_modified.extend(result_artifacts.get("files_modified", ()))
+                commands_executed.extend(result_artifacts.get("commands_executed", ()))
+                errors.extend(result_artifacts.get("errors", ()))
         
-        return {
+        response = {
             "summary": "\n".join(summary_parts),
             "code_changes": code_changes,
             "total_tasks": len(results),
-            "successful_tasks": sum(1 for r in results if r.get("success"))
+            # Counted from this request's results; overlapping requests share the task table
+            "successful_tasks": successful
         }
-    
-    def _collect_artifacts(self, results: List[Dict]) -> Dict[str, Any]:
-        """
-        Collect all artifacts generated during execution
-        """
         artifacts = {
-            "files_created": [],
-            "files_modified": [],
-            "commands_executed": [],
-            "errors": []
+            "files_created": files_created,
+            "files_modified": files_modified,
+            "commands_executed": commands_executed,
+            "errors": errors
         }
-        
-        for result in results:
-            if "artifacts" in result:
-                for key in artifacts:
-                    if key in result["artifacts"]:
-                        artifacts[key].extend(result["artifacts"][key])
-        
-        return artifacts
+        return response, artifacts
     
     def reset(self):
         """
@@ -3,27 +3,194 @@ Code Execution Module for Devon Agent
 """
 
 import os
-import subprocess
+import re
+import shlex
+import signal
+import sys
+import asyncio
 import ast
 import json
 import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import logging
 
+try:
+    import aiofiles
+except ImportError:  # pragma: no cover - optional dependency
+    aiofiles = None
+
 logger = logging.getLogger(__name__)
 
+# Whole lines containing a marker, matched in one pass over a file's source
+_TODO_LINE_RE = re.compile(r'^.*TODO.*$', re.M)
+_BARE_EXCEPT_LINE_RE = re.compile(r'^[ \t]*except:.*$', re.M)
+
+
+def _iter_matching_lines(source: str, pattern: "re.Pattern[str]"):
+    """Yield (line number, line) for each line of source matched by a whole-line pattern"""
+    line_no, pos = 1, 0
+    for match in pattern.finditer(source):
+        line_no += source.count("\n", pos, match.start())
+        pos = match.start()
+        yield line_no, match.group(0)
+
+# Static code templates written by the executor
+_API_CODE = '''from flask import Flask, jsonify, request
+
+app = Flask(__name__)
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    return jsonify({"status": "healthy", "version": "1.0.0"})
+
+@app.route('/api/data', methods=['GET'])
+def get_data():
+    """Get data endpoint"""
+    # TODO: Implement data retrieval logic
+    return jsonify({"data": [], "count": 0})
+
+@app.route('/api/data', methods=['POST'])
+def create_data():
+    """Create data endpoint"""
+    data = request.json
+    # TODO: Implement data creation logic
+    return jsonify({"success": True, "id": "generated_id"}), 201
+
+if __name__ == '__main__':
+    app.run(debug=True, port=5000)
+'''
+
+_FUNCTION_CODE = '''def process_data(input_data):
+    """
+    Process input data and return results
+    
+    Args:
+        input_data: Data to process
+    
+    Returns:
+        Processed data
+    """
+    # Validate input
+    if not input_data:
+        raise ValueError("Input data cannot be empty")
+    
+    # Process data
+    result = []
+    for item in input_data:
+        processed_item = transform_item(item)
+        result.append(processed_item)
+    
+    return result
+
+def transform_item(item):
+    """Transform a single item"""
+    # TODO: Implement transformation logic
+    return {
+        "original": item,
+        "transformed": str(item).upper(),
+        "timestamp": None
+    }
+'''
+
+_GENERIC_CODE = '''"""
+Auto-generated module
+"""
+
+class Implementation:
+    """Main implementation class"""
+    
+    def __init__(self):
+        self.data = []
+    
+    def process(self, input_value):
+        """Process input value"""
+        # TODO: Implement processing logic
+        self.data.append(input_value)
+        return True
+    
+    def get_results(self):
+        """Get processing results"""
+        return self.data.copy()
+'''
+
+_TEST_CODE = '''import unittest
+
+class TestGenerated(unittest.TestCase):
+    """Auto-generated tests"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.test_data = [1, 2, 3, 4, 5]
+    
+    def test_basic_functionality(self):
+        """Test basic functionality"""
+        self.assertTrue(True)
+        self.assertEqual(1 + 1, 2)
+    
+    def test_data_processing(self):
+        """Test data processing"""
+        result = sum(self.test_data)
+        self.assertEqual(result, 15)
+    
+    def test_edge_cases(self):
+        """Test edge cases"""
+        self.assertIsNone(None)
+        self.assertEqual([], [])
+
+if __name__ == '__main__':
+    unittest.main()
+'''
+
+# Keyword -> code template, checked in order against the lowercased task
+_CODE_DISPATCH = (
+    ("api", _API_CODE),
+    ("function", _FUNCTION_CODE),
+)
+
+# Keyword -> file path, checked in order against the lowercased task
+_FILE_PATH_DISPATCH = (
+    ("api", "api/endpoints.py"),
+    ("test", "tests/test_main.py"),
+    ("model", "models/data_model.py"),
+)
+
+# Keyword -> task handler name, checked in order against the lowercased task
+_TASK_DISPATCH = (
+    ("test", "_execute_test_task"),
+    ("implement", "_execute_implementation_task"),
+    ("write", "_execute_implementation_task"),
+    ("analyze", "_execute_analysis_task"),
+    ("fix", "_execute_debug_task"),
+    ("debug", "_execute_debug_task"),
+)
+
 
 class CodeExecutor:
     """
     Responsible for executing code-related tasks
     """
     
-    def __init__(self, workspace_path: str = "./workspace"):
+    def __init__(self, workspace_path: str = "./workspace", file_cache_size: int = 256,
+                 test_timeout: float = 300.0):
         self.workspace_path = Path(workspace_path)
         self.workspace_path.mkdir(exist_ok=True)
         self.execution_history = []
-        
+        # Source and parsed tree of recently read files, keyed on modification
+        # time and size, least recently used first
+        self.file_cache_size = file_cache_size
+        self._file_cache: "OrderedDict[Path, Tuple[Tuple[int, int], str, Optional[ast.AST]]]" = OrderedDict()
+        # Scans read files from worker threads
+        self._file_cache_lock = threading.Lock()
+        # One lock per output file, so concurrent tasks writing the same path run in turn
+        self._path_locks: Dict[Path, asyncio.Lock] = {}
+        # Seconds a test run may take before its process is killed
+        self.test_timeout = test_timeout
+    
     async def execute_task(self, task: str, context: Dict[str, Any] = None, 
                           memory: Any = None) -> Dict[str, Any]:
         """
@@ -33,7 +200,7 @@ class CodeExecutor:
             task: The task description
             context: Current execution context
             memory: Memory manager instance
-            
+        
         Returns:
             Dictionary with execution results
         """
@@ -41,17 +208,12 @@ class CodeExecutor:
         
         try:
             # Determine task type and execute accordingly
-            if "test" in task.lower():
-                return await self._execute_test_task(task, context)
-            elif "implement" in task.lower() or "write" in task.lower():
-                return await self._execute_implementation_task(task, context)
-            elif "analyze" in task.lower():
-                return await self._execute_analysis_task(task, context)
-            elif "fix" in task.lower() or "debug" in task.lower():
-                return await self._execute_debug_task(task, context)
-            else:
-                return await self._execute_generic_task(task, context)
-                
+            task_lower = task.lower()
+            for keyword, handler in _TASK_DISPATCH:
+                if keyword in task_lower:
+                    return await getattr(self, handler)(task, context)
+            return await self._execute_generic_task(task, context)
+        
         except Exception as e:
             logger.error(f"Task execution failed: {e}")
             return {
@@ -64,21 +226,21 @@ class CodeExecutor:
         """
         Execute an implementation task
         """
+        task_lower = task.lower()
+        
         # Generate code based on task description
-        code = self._generate_code_snippet(task, context)
+        code = self._generate_code_snippet(task_lower, context)
         
         # Determine file path
-        file_path = self._determine_file_path(task, context)
+        file_path = self._determine_file_path(task_lower, context)
         
-        # Write code to file
+        # Write code to file and validate it while no other task can rewrite it
         full_path = self.workspace_path / file_path
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(full_path, 'w') as f:
-            f.write(code)
-        
-        # Validate the code
-        validation = self._validate_code(full_path)
+        async with self._path_lock(full_path):
+            await self._write_file(full_path, code)
+            
+            # Validate the code off the event loop, parsing is CPU-bound
+            validation = await asyncio.to_thread(self._validate_code, full_path)
         
         return {
             "success": validation["valid"],
@@ -104,15 +266,11 @@ class CodeExecutor:
         # Generate test code
         test_code = self._generate_test_code(task, context)
         
-        # Write test file
+        # Write and run the test file while no other task can rewrite it
         test_file = self.workspace_path / "tests" / "test_generated.py"
-        test_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(test_file, 'w') as f:
-            f.write(test_code)
-        
-        # Run tests
-        result = self._run_tests(test_file)
+        async with self._path_lock(test_file):
+            await self._write_file(test_file, test_code)
+            result = await self._run_tests(test_file)
         
         return {
             "success": result["passed"],
@@ -129,7 +287,7 @@ class CodeExecutor:
         Execute an analysis task
         """
         # Analyze code in workspace
-        analysis_results = self._analyze_codebase()
+        analysis_results = await asyncio.to_thread(self._analyze_codebase)
         
         return {
             "success": True,
@@ -146,7 +304,7 @@ class CodeExecutor:
         Execute a debugging task
         """
         # Find potential bug locations
-        bug_locations = self._find_bug_locations(context)
+        bug_locations = await asyncio.to_thread(self._find_bug_locations, context)
         
         # Generate fixes
         fixes = []
@@ -156,7 +314,8 @@ class CodeExecutor:
             
             # Apply fix
             if fix["confidence"] > 0.7:
-                self._apply_fix(fix)
+                async with self._path_lock(self.workspace_path / fix["file"]):
+                    await asyncio.to_thread(self._apply_fix, fix)
         
         return {
             "success": len(fixes) > 0,
@@ -182,152 +341,88 @@ class CodeExecutor:
             }
         }
     
-    def _generate_code_snippet(self, task: str, context: Dict[str, Any]) -> str:
+    def _path_lock(self, path: Path) -> asyncio.Lock:
         """
-        Generate code based on task description
+        Lock serializing the tasks that write the given file
         """
-        # Simplified code generation
-        if "api" in task.lower():
-            return self._generate_api_code()
-        elif "function" in task.lower():
-            return self._generate_function_code()
-        else:
-            return self._generate_generic_code()
-    
-    def _generate_api_code(self) -> str:
-        """Generate API endpoint code"""
-        return '''from flask import Flask, jsonify, request
-
-app = Flask(__name__)
-
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
-    return jsonify({"status": "healthy", "version": "1.0.0"})
-
-@app.route('/api/data', methods=['GET'])
-def get_data():
-    """Get data endpoint"""
-    # TODO: Implement data retrieval logic
-    return jsonify({"data": [], "count": 0})
-
-@app.route('/api/data', methods=['POST'])
-def create_data():
-    """Create data endpoint"""
-    data = request.json
-    # TODO: Implement data creation logic
-    return jsonify({"success": True, "id": "generated_id"}), 201
-
-if __name__ == '__main__':
-    app.run(debug=True, port=5000)
-'''
-    
-    def _generate_function_code(self) -> str:
-        """Generate function code"""
-        return '''def process_data(input_data):
-    """
-    Process input data and return results
+        lock = self._path_locks.get(path)
+        if lock is None:
+            lock = self._path_locks[path] = asyncio.Lock()
+        return lock
     
-    Args:
-        input_data: Data to process
-        
-    Returns:
-        Processed data
-    """
-    # Validate input
-    if not input_data:
-        raise ValueError("Input data cannot be empty")
-    
-    # Process data
-    result = []
-    for item in input_data:
-        processed_item = transform_item(item)
-        result.append(processed_item)
-    
-    return result
-
-def transform_item(item):
-    """Transform a single item"""
-    # TODO: Implement transformation logic
-    return {
-        "original": item,
-        "transformed": str(item).upper(),
-        "timestamp": None
-    }
-'''
-    
-    def _generate_generic_code(self) -> str:
-        """Generate generic code"""
-        return '''"""
-Auto-generated module
-"""
-
-class Implementation:
-    """Main implementation class"""
-    
-    def __init__(self):
-        self.data = []
-        
-    def process(self, input_value):
-        """Process input value"""
-        # TODO: Implement processing logic
-        self.data.append(input_value)
-        return True
+    async def _write_file(self, path: Path, content: str):
+        """
+        Write a text file without blocking the event loop
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if aiofiles is not None:
+            async with aiofiles.open(path, 'w') as f:
+                await f.write(content)
+        else:
+            await asyncio.to_thread(path.write_text, content)
     
-    def get_results(self):
-        """Get processing results"""
-        return self.data.copy()
-'''
+    def _generate_code_snippet(self, task_lower: str, context: Dict[str, Any]) -> str:
+        """
+        Generate code based on the lowercased task description
+        """
+        # Simplified code generation
+        for keyword, code in _CODE_DISPATCH:
+            if keyword in task_lower:
+                return code
+        return _GENERIC_CODE
     
     def _generate_test_code(self, task: str, context: Dict[str, Any]) -> str:
         """Generate test code"""
-        return '''import unittest
-
-class TestGenerated(unittest.TestCase):
-    """Auto-generated tests"""
+        return _TEST_CODE
     
-    def setUp(self):
-        """Set up test fixtures"""
-        self.test_data = [1, 2, 3, 4, 5]
+    def _determine_file_path(self, task_lower: str, context: Dict[str, Any]) -> str:
+        """Determine appropriate file path for the lowercased task"""
+        for keyword, file_path in _FILE_PATH_DISPATCH:
+            if keyword in task_lower:
+                return file_path
+        return "src/implementation.py"
     
-    def test_basic_functionality(self):
-        """Test basic functionality"""
-        self.assertTrue(True)
-        self.assertEqual(1 + 1, 2)
+    def _cached_file(self, file_path: Path) -> Tuple[Tuple[int, int], str, Optional[ast.AST]]:
+        """Return a file's cache entry, re-reading the file if it changed"""
+        st = file_path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._file_cache_lock:
+            cached = self._file_cache.get(file_path)
+            if cached is not None and cached[0] == stamp:
+                self._file_cache.move_to_end(file_path)
+                return cached
+        
+        with open(file_path, 'r') as f:
+            source = f.read()
+        entry = (stamp, source, None)
+        self._store_file(file_path, entry)
+        return entry
     
-    def test_data_processing(self):
-        """Test data processing"""
-        result = sum(self.test_data)
-        self.assertEqual(result, 15)
+    def _store_file(self, file_path: Path, entry: Tuple[Tuple[int, int], str, Optional[ast.AST]]):
+        """Cache a file's entry, evicting the least recently used one beyond the size limit"""
+        with self._file_cache_lock:
+            self._file_cache[file_path] = entry
+            self._file_cache.move_to_end(file_path)
+            if len(self._file_cache) > self.file_cache_size:
+                self._file_cache.popitem(last=False)
     
-    def test_edge_cases(self):
-        """Test edge cases"""
-        self.assertIsNone(None)
-        self.assertEqual([], [])
-
-if __name__ == '__main__':
-    unittest.main()
-'''
+    def _read_source(self, file_path: Path) -> str:
+        """Read a file, reusing the cached source while the file is unchanged"""
+        return self._cached_file(file_path)[1]
     
-    def _determine_file_path(self, task: str, context: Dict[str, Any]) -> str:
-        """Determine appropriate file path for task"""
-        if "api" in task.lower():
-            return "api/endpoints.py"
-        elif "test" in task.lower():
-            return "tests/test_main.py"
-        elif "model" in task.lower():
-            return "models/data_model.py"
-        else:
-            return "src/implementation.py"
+    def _read_and_parse(self, file_path: Path) -> Tuple[str, ast.AST]:
+        """Read and parse a Python file, caching the tree while the file is unchanged"""
+        stamp, source, tree = self._cached_file(file_path)
+        if tree is None:
+            tree = ast.parse(source)
+            self._store_file(file_path, (stamp, source, tree))
+        return source, tree
     
     def _validate_code(self, file_path: Path) -> Dict[str, Any]:
         """Validate Python code"""
         try:
-            with open(file_path, 'r') as f:
-                code = f.read()
-            
             # Try to parse as Python
-            ast.parse(code)
+            self._read_and_parse(file_path)
             
             return {
                 "valid": True,
@@ -339,29 +434,94 @@ if __name__ == '__main__':
                 "errors": [str(e)]
             }
     
-    def _run_tests(self, test_file: Path) -> Dict[str, Any]:
-        """Run tests and return results"""
+    async def _run_tests(self, test_file: Path) -> Dict[str, Any]:
+        """
+        Run tests and return results
+        
+        Output is read line by line as pytest produces it; the run stops at the
+        first failure (-x), and is killed along with its children if it takes
+        longer than test_timeout.
+        """
+        argv = [sys.executable, "-m", "pytest", str(test_file), "-v", "-x"]
+        cmd = " ".join(shlex.quote(arg) for arg in argv)
         try:
-            cmd = f"python -m pytest {test_file} -v"
-            result = subprocess.run(
-                cmd.split(),
-                capture_output=True,
-                text=True,
-                cwd=self.workspace_path
+            process = await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=self.workspace_path,
+                start_new_session=os.name == "posix"
             )
-            
-            return {
-                "passed": result.returncode == 0,
-                "output": result.stdout,
-                "errors": result.stderr,
-                "command": cmd
-            }
         except Exception as e:
             return {
                 "passed": False,
                 "error": str(e),
                 "command": cmd
             }
+        
+        # Drain stderr alongside stdout so neither pipe can fill up and stall pytest
+        stderr_task = asyncio.create_task(process.stderr.read())
+        lines = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.test_timeout
+        
+        async def before_deadline(awaitable):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                awaitable.close()
+                raise asyncio.TimeoutError
+            return await asyncio.wait_for(awaitable, remaining)
+        
+        timed_out = False
+        try:
+            while True:
+                line = await before_deadline(process.stdout.readline())
+                if not line:
+                    break
+                lines.append(line.decode(errors="replace"))
+            await before_deadline(process.wait())
+        except asyncio.TimeoutError:
+            timed_out = True
+            try:
+                if os.name == "posix":
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+        errors = (await stderr_task).decode(errors="replace")
+        
+        result = {
+            "passed": not timed_out and process.returncode == 0,
+            "output": "".join(lines),
+            "errors": errors,
+            "command": cmd
+        }
+        if timed_out:
+            result["error"] = f"Tests timed out after {self.test_timeout} seconds"
+        return result
+    
+    def _scan_file(self, file: Path) -> Tuple[int, List[Dict[str, Any]]]:
+        """Count a file's lines and collect its TODO issues"""
+        source = self._read_source(file)
+        line_count = source.count("\n")
+        if source and not source.endswith("\n"):
+            line_count += 1
+        
+        # Check for common issues
+        issues = []
+        if "TODO" in source:
+            rel = str(file.relative_to(self.workspace_path))
+            for line_no, line in _iter_matching_lines(source, _TODO_LINE_RE):
+                issues.append({
+                    "file": rel,
+                    "line": line_no,
+                    "type": "TODO",
+                    "message": line.strip()
+                })
+        
+        return line_count, issues
     
     def _analyze_codebase(self) -> Dict[str, Any]:
         """Analyze the codebase"""
@@ -370,21 +530,15 @@ if __name__ == '__main__':
         total_lines = 0
         issues = []
         
-        for file in py_files:
+        # File reads release the GIL, so scan files concurrently
+        with ThreadPoolExecutor(max_workers=max(1, min(32, len(py_files)))) as pool:
+            futures = [pool.submit(self._scan_file, file) for file in py_files]
+        
+        for file, future in zip(py_files, futures):
             try:
-                with open(file, 'r') as f:
-                    lines = f.readlines()
-                    total_lines += len(lines)
-                    
-                    # Check for common issues
-                    for i, line in enumerate(lines, 1):
-                        if "TODO" in line:
-                            issues.append({
-                                "file": str(file.relative_to(self.workspace_path)),
-                                "line": i,
-                                "type": "TODO",
-                                "message": line.strip()
-                            })
+                line_count, file_issues = future.result()
+                total_lines += line_count
+                issues.extend(file_issues)
             except Exception as e:
                 logger.error(f"Error analyzing {file}: {e}")
         
@@ -411,17 +565,21 @@ if __name__ == '__main__':
         py_files = list(self.workspace_path.rglob("*.py"))
         for file in py_files[:5]:  # Limit search
             try:
-                with open(file, 'r') as f:
-                    lines = f.readlines()
-                    for i, line in enumerate(lines, 1):
-                        if "except:" in line:  # Bare except
-                            locations.append({
-                                "file": str(file.relative_to(self.workspace_path)),
-                                "line": i,
-                                "description": "Bare except clause"
-                            })
-            except Exception:
-                pass
+                source = self._read_source(file)
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"Skipping unreadable file {file}: {e}")
+                continue
+            if "except" not in source:
+                continue
+            
+            # Only code lines count, not e.g. "# except: none" in a comment
+            rel = str(file.relative_to(self.workspace_path))
+            for line_no, _ in _iter_matching_lines(source, _BARE_EXCEPT_LINE_RE):
+                locations.append({
+                    "file": rel,
+                    "line": line_no,
+                    "description": "Bare except clause"
+                })
         
         return locations
     
@@ -456,7 +614,7 @@ if __name__ == '__main__':
             
             with open(file_path, 'w') as f:
                 f.writelines(lines)
-                
+            
             logger.info(f"Applied fix to {fix['file']}:{fix['line']}")
         except Exception as e:
             logger.error(f"Failed to apply fix: {e}")
\ No newline at end of file
@@ -2,39 +2,289 @@
 Memory Management Module for Devon Agent
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Hashable, Set, Tuple, Callable
 from datetime import datetime
-from collections import deque
+import asyncio
 import json
+import os
 import pickle
+import re
 from pathlib import Path
 import logging
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import aiofiles
+except ImportError:  # pragma: no cover - optional dependency
+    aiofiles = None
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+from .memory_store import SQLiteInteractionStore, SQLITE_SUFFIXES
 
 logger = logging.getLogger(__name__)
 
 
+def _dumps(obj: Any) -> bytes:
+    """Serialize an object to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _dumps_indented(obj: Any) -> bytes:
+    """Serialize an object to JSON bytes indented by two spaces"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, default=str).encode("utf-8")
+
+
+def _loads(data: Any) -> Any:
+    """Deserialize JSON from bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# tiktoken encoder state: "loading" once a load has started, "encoder" once it finished
+_encoder_state: Dict[str, Any] = {}
+_encoder_lock = threading.Lock()
+
+
+def _load_encoder():
+    """Load the tiktoken encoder (may download its BPE file)"""
+    try:
+        encoder = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # e.g. encoding files cannot be downloaded
+        logger.warning("tiktoken encoder unavailable, estimating tokens: %s", e)
+        encoder = None
+    _encoder_state["encoder"] = encoder
+
+
+def _get_encoder() -> Any:
+    """
+    The tiktoken encoder if it has loaded, else None
+    
+    The first call starts loading it on a background thread, so callers
+    never wait on the download.
+    """
+    if tiktoken is None:
+        return None
+    if "encoder" in _encoder_state:
+        return _encoder_state["encoder"]
+    with _encoder_lock:
+        if "loading" not in _encoder_state:
+            _encoder_state["loading"] = True
+            threading.Thread(target=_load_encoder, name="tiktoken-loader", daemon=True).start()
+    return None
+
+
+def _count_tokens(text: str) -> int:
+    """Count model tokens in text, estimating ~4 characters per token until tiktoken is loaded"""
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def _timestamp_seconds(interaction: Dict[str, Any]) -> float:
+    """Epoch seconds of an interaction's ISO timestamp, or now if it is unreadable"""
+    try:
+        return datetime.fromisoformat(interaction["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+
+# Longest text produced by the built-in summarizer
+_SUMMARY_MAX_CHARS = 1000
+
+
+def _default_summary(entries: List[Dict[str, Any]]) -> str:
+    """Condense entries to their roles and the start of their first lines"""
+    parts = []
+    for entry in entries:
+        content = entry.get("content", "")
+        if content.startswith("SUMMARY: "):
+            parts.append(content[len("SUMMARY: "):])
+            continue
+        first_line = content.strip().split("\n", 1)[0]
+        parts.append(f"{entry.get('role', '?')}: {first_line[:80]}")
+    return "; ".join(parts)[:_SUMMARY_MAX_CHARS]
+
+
+_TOKEN_RE = re.compile(r"\w+")
+_PATH_RE = re.compile(r'[./\\]?[\w./\\-]+\.\w+')
+_DEF_RE = re.compile(r'(def|class)\s+(\w+)')
+
+# Long-term key prefixes tracked by MemoryManager counters
+_COUNTED_KINDS = ("file", "function", "class", "error")
+
+
+class _SubstringIndex:
+    """
+    Token index over lowercased documents for case-insensitive substring search
+    
+    A query token that is bounded by non-word characters inside the query must
+    appear as a whole token in any matching document, so those tokens are used
+    to narrow the candidates before the exact substring check.
+    """
+    
+    def __init__(self):
+        self._docs: Dict[Hashable, Tuple[str, ...]] = {}
+        self._order: Dict[Hashable, int] = {}
+        self._postings: Dict[str, Set[Hashable]] = {}
+        self._counter = 0
+    
+    def add(self, doc_id: Hashable, *texts: str):
+        """Index (or re-index) a document made of one or more texts"""
+        if doc_id in self._docs:
+            self._unindex(doc_id)
+        else:
+            self._order[doc_id] = self._counter
+            self._counter += 1
+        
+        lowered = tuple(text.lower() for text in texts)
+        self._docs[doc_id] = lowered
+        for text in lowered:
+            for token in _TOKEN_RE.findall(text):
+                self._postings.setdefault(token, set()).add(doc_id)
+    
+    def _unindex(self, doc_id: Hashable):
+        """Drop a document's postings"""
+        for text in self._docs[doc_id]:
+            for token in _TOKEN_RE.findall(text):
+                posting = self._postings.get(token)
+                if posting is not None:
+                    posting.discard(doc_id)
+                    if not posting:
+                        del self._postings[token]
+    
+    def clear(self):
+        """Remove all documents"""
+        self._docs.clear()
+        self._order.clear()
+        self._postings.clear()
+        self._counter = 0
+    
+    def search(self, query: str, within: Optional[Any] = None) -> List[Hashable]:
+        """
+        Return ids of documents containing the query, in insertion order
+        
+        Args:
+            query: Substring to look for (case-insensitive)
+            within: Optional container of ids to restrict the search to
+        """
+        query_lower = query.lower()
+        
+        # Tokens with a non-word character on both sides are whole tokens
+        whole_tokens = [
+            m.group(0) for m in _TOKEN_RE.finditer(query_lower)
+            if m.start() > 0 and m.end() < len(query_lower)
+        ]
+        
+        if whole_tokens:
+            postings = sorted(
+                (self._postings.get(token, set()) for token in whole_tokens), key=len
+            )
+            candidates = set(postings[0]).intersection(*postings[1:])
+            if within is not None:
+                candidates = [doc_id for doc_id in candidates if doc_id in within]
+        else:
+            candidates = within if within is not None else self._docs.keys()
+        
+        matches = [
+            doc_id for doc_id in candidates
+            if any(query_lower in text for text in self._docs[doc_id])
+        ]
+        matches.sort(key=self._order.__getitem__)
+        return matches
+
+
 class MemoryManager:
     """
     Manages short-term and long-term memory for the agent
     """
     
-    def __init__(self, max_short_term: int = 100, persistence_path: Optional[str] = None):
+    def __init__(self, max_short_term: int = 100, persistence_path: Optional[str] = None,
+                 token_budget: Optional[int] = None, consolidate_every: int = 0,
+                 summarizer: Optional[Callable[[List[Dict[str, Any]]], Any]] = None,
+                 keep_recent: int = 10):
         """
         Initialize memory manager
         
         Args:
             max_short_term: Maximum number of items in short-term memory
-            persistence_path: Path to persist long-term memory
+            persistence_path: Path to persist memory; a .db/.sqlite path uses a SQLite store
+            token_budget: Maximum tokens kept in the working context (None for no limit,
+                in which case tokens are only counted by get_budgeted_context)
+            consolidate_every: Number of interactions condensed into each summary (0, the default, disables)
+            summarizer: Optional callable, sync or async, turning entries into summary text
+            keep_recent: Number of newest interactions never consolidated (at least 1)
         """
-        self.short_term = deque(maxlen=max_short_term)
+        self.max_short_term = max_short_term
+        self.token_budget = token_budget
+        self.consolidate_every = consolidate_every
+        self.summarizer = summarizer
+        self.keep_recent = max(keep_recent, 1)
         self.long_term = {}
         self.interactions = []
         self.persistence_path = Path(persistence_path) if persistence_path else None
+        # SQLite store that replaces the JSON files for .db/.sqlite paths
+        self._store: Optional[SQLiteInteractionStore] = None
+        if self.persistence_path and self.persistence_path.suffix in SQLITE_SUFFIXES:
+            self._store = SQLiteInteractionStore(str(self.persistence_path))
+        # Search indexes over interaction contents and long-term entries
+        self._interaction_index = _SubstringIndex()
+        self._long_term_index = _SubstringIndex()
+        # Ids of the interactions mentioning each normalized file path
+        self._file_to_indices: Dict[str, List[int]] = {}
+        # Encoded JSON views of the memory, dropped whenever memory changes
+        self._json_cache: Dict[Any, bytes] = {}
+        # Bumped on every invalidation; a view encoded from an older version is
+        # not cached, so a reader racing an update cannot store stale bytes
+        self._json_version = 0
+        self._json_lock = threading.Lock()
+        # Number of long-term entries of each kind, keyed by key prefix
+        self._counts = dict.fromkeys(_COUNTED_KINDS, 0)
+        # Number of interactions already appended to the interactions log, and
+        # whether the log must be rewritten rather than appended to
+        self._persisted_count = 0
+        self._rewrite_log = False
+        # Token count (None until first needed) and arrival time per interaction,
+        # and the ordered set of interaction ids that make up the working context
+        self._token_counts: List[Optional[int]] = []
+        self._added_at: List[float] = []
+        self._working: Dict[int, None] = {}
+        self._running_tokens = 0
+        # Summaries of consolidated interactions, oldest first, and the number
+        # of leading interactions they cover
+        self._summaries: List[Dict[str, Any]] = []
+        self._summarized_upto = 0
+        self._consolidation_task: Optional[asyncio.Task] = None
+        self._generation = 0
         
         # Load existing memory if available
         if self.persistence_path and self.persistence_path.exists():
             self.load_memory()
     
+    @property
+    def short_term(self) -> List[Dict[str, Any]]:
+        """
+        Short-term memory: the most recent interactions
+        """
+        if self.max_short_term <= 0:
+            return []
+        return self.interactions[-self.max_short_term:]
+    
     def add_interaction(self, role: str, content: str, metadata: Dict[str, Any] = None):
         """
         Add an interaction to memory
@@ -52,10 +302,20 @@ class MemoryManager:
         }
         
         self.interactions.append(interaction)
-        self.short_term.append(interaction)
+        if self._store is not None:
+            self._store.append(interaction)
+        self._interaction_index.add(len(self.interactions) - 1, content)
+        self._index_paths(len(self.interactions) - 1, content)
+        self._track_tokens(len(self.interactions) - 1, time.time())
+        self._enforce_budget()
+        self._schedule_consolidation()
         
         # Extract and store important information in long-term memory
         self._extract_to_long_term(interaction)
+        
+        # Invalidate cached JSON views only after every update, so a concurrent
+        # reader cannot re-cache a view of the old state
+        self._invalidate_json()
     
     def get_recent_context(self, n: int = 10) -> List[Dict[str, Any]]:
         """
@@ -63,11 +323,258 @@ class MemoryManager:
         
         Args:
             n: Number of recent items to retrieve
-            
+        
         Returns:
             List of recent interactions
         """
-        return list(self.short_term)[-n:]
+        return self.short_term[-n:]
+    
+    def get_recent_context_json(self, n: int = 10) -> bytes:
+        """
+        Get recent context encoded as JSON bytes, cached until memory changes
+        """
+        return self._cached_json(("recent_context", n), lambda: self.get_recent_context(n))
+    
+    def _cached_json(self, key: Any, build: Callable[[], Any]) -> bytes:
+        """
+        Encode build() as JSON, caching the bytes unless memory changed meanwhile
+        """
+        data = self._json_cache.get(key)
+        if data is not None:
+            return data
+        
+        version = self._json_version
+        data = _dumps(build())
+        with self._json_lock:
+            if version == self._json_version:
+                self._json_cache[key] = data
+        return data
+    
+    def _invalidate_json(self):
+        """
+        Drop the cached JSON views after memory changed
+        """
+        with self._json_lock:
+            self._json_version += 1
+            self._json_cache.clear()
+    
+    def get_budgeted_context(self, max_tokens: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get the working context, newest interactions first in priority, within a token limit
+        
+        Summaries of consolidated interactions fill any remaining room ahead
+        of the interactions, newest summary first.
+        
+        Args:
+            max_tokens: Token limit, defaulting to the memory's token budget
+        
+        Returns:
+            Summaries then interactions, in chronological order
+        """
+        limit = max_tokens if max_tokens is not None else self.token_budget
+        selected = []
+        used = 0
+        for idx in reversed(self._working):
+            tokens = self._tokens_of(idx)
+            if limit is not None and used + tokens > limit:
+                break
+            used += tokens
+            selected.append(self.interactions[idx])
+        else:
+            for summary in reversed(self._summaries):
+                tokens = self._summary_tokens(summary)
+                if limit is not None and used + tokens > limit:
+                    break
+                used += tokens
+                selected.append(summary)
+        selected.reverse()
+        return selected
+    
+    def _tokens_of(self, idx: int) -> int:
+        """
+        Token count of an interaction, counted on first use
+        """
+        tokens = self._token_counts[idx]
+        if tokens is None:
+            tokens = self._token_counts[idx] = _count_tokens(self.interactions[idx].get("content", ""))
+        return tokens
+    
+    @staticmethod
+    def _summary_tokens(summary: Dict[str, Any]) -> int:
+        """
+        Token count of a summary entry, counted on first use
+        """
+        metadata = summary["metadata"]
+        tokens = metadata.get("tokens")
+        if tokens is None:
+            tokens = metadata["tokens"] = _count_tokens(summary["content"])
+        return tokens
+    
+    def _track_tokens(self, idx: int, added_at: float):
+        """
+        Add an interaction to the working context
+        
+        Tokens are only counted up front when a token budget is enforced.
+        """
+        self._token_counts.append(None)
+        self._added_at.append(added_at)
+        self._working[idx] = None
+        if self.token_budget is not None:
+            self._running_tokens += self._tokens_of(idx)
+    
+    def _drop_from_working(self, idx: int):
+        """
+        Remove an interaction from the working context if it is still there
+        """
+        if idx in self._working:
+            del self._working[idx]
+            if self.token_budget is not None:
+                self._running_tokens -= self._tokens_of(idx)
+    
+    def _enforce_budget(self):
+        """
+        Evict interactions from the working context until it fits the token budget
+        
+        Entries are ranked by an Ebbinghaus-style retention score,
+        tokens / (1 + sqrt(age in seconds)), so old and small entries go first.
+        The newest interaction is always kept. Evicted interactions stay in the
+        full history, which save_memory writes to disk.
+        """
+        if self.token_budget is None or self._running_tokens <= self.token_budget:
+            return
+        
+        now = time.time()
+        newest = len(self.interactions) - 1
+        candidates = sorted(
+            (idx for idx in self._working if idx != newest),
+            key=lambda idx: self._tokens_of(idx) / (1 + max(now - self._added_at[idx], 0) ** 0.5)
+        )
+        for idx in candidates:
+            if self._running_tokens <= self.token_budget:
+                break
+            self._drop_from_working(idx)
+    
+    def _rebuild_working_context(self):
+        """
+        Recompute token counts and the working context from the interaction list
+        """
+        self._token_counts = []
+        self._added_at = []
+        self._working = {}
+        self._running_tokens = 0
+        for idx, interaction in enumerate(self.interactions):
+            self._track_tokens(idx, _timestamp_seconds(interaction))
+        for idx in range(min(self._summarized_upto, len(self.interactions))):
+            self._drop_from_working(idx)
+        self._enforce_budget()
+    
+    def _consolidatable(self) -> int:
+        """
+        Number of unsummarized interactions older than the recent window
+        """
+        return len(self.interactions) - self.keep_recent - self._summarized_upto
+    
+    def _schedule_consolidation(self):
+        """
+        Start consolidation in the background once enough interactions are unsummarized
+        
+        Consolidation only runs on an active event loop. Without one it is
+        deferred until an interaction is added from inside a running loop.
+        """
+        if self.consolidate_every <= 0:
+            return
+        if self._consolidatable() < self.consolidate_every:
+            return
+        if self._consolidation_task is not None and not self._consolidation_task.done():
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._consolidation_task = loop.create_task(self._consolidate())
+    
+    async def _summarize(self, entries: List[Dict[str, Any]]) -> str:
+        """
+        Summarize entries with the configured summarizer or the built-in condenser
+        """
+        if self.summarizer is None:
+            return _default_summary(entries)
+        result = self.summarizer(entries)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return str(result)
+    
+    def _make_summary(self, text: str, start: int, end: int, level: int) -> Dict[str, Any]:
+        """
+        Build a summary entry covering interactions [start, end)
+        """
+        content = f"SUMMARY: {text}"
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "role": "system",
+            "content": content,
+            "metadata": {
+                "summarized_range": [start, end],
+                "level": level,
+                # Counted lazily unless a token budget is enforced
+                "tokens": _count_tokens(content) if self.token_budget is not None else None
+            }
+        }
+    
+    async def _consolidate(self):
+        """
+        Replace runs of the oldest unsummarized interactions with summary entries
+        
+        Each run of consolidate_every interactions becomes one summary and leaves
+        the working context. The newest keep_recent interactions are never
+        consolidated. When consolidate_every summaries of the same level
+        accumulate they are condensed again into one higher-level summary.
+        """
+        size = self.consolidate_every
+        generation = self._generation
+        
+        while size > 0 and self._consolidatable() >= size:
+            start = self._summarized_upto
+            end = start + size
+            try:
+                text = await self._summarize(self.interactions[start:end])
+            except Exception as e:
+                logger.error("Failed to consolidate memory: %s", e)
+                return
+            if generation != self._generation:
+                return  # memory was cleared or reloaded meanwhile
+            
+            self._summaries.append(self._make_summary(text, start, end, 0))
+            self._summarized_upto = end
+            for idx in range(start, end):
+                self._drop_from_working(idx)
+            self._invalidate_json()
+            
+            # Condense the oldest run of same-level summaries into one
+            level = 0
+            while True:
+                run = [i for i, entry in enumerate(self._summaries) if entry["metadata"]["level"] == level]
+                if len(run) < size:
+                    break
+                group = [self._summaries[i] for i in run[:size]]
+                try:
+                    text = await self._summarize(group)
+                except Exception as e:
+                    logger.error("Failed to consolidate memory: %s", e)
+                    return
+                if generation != self._generation:
+                    return
+                merged = self._make_summary(
+                    text,
+                    group[0]["metadata"]["summarized_range"][0],
+                    group[-1]["metadata"]["summarized_range"][1],
+                    level + 1
+                )
+                # Summaries stay in chronological order, so a level's run is contiguous
+                self._summaries[run[0]:run[0] + size] = [merged]
+                self._invalidate_json()
+                level += 1
     
     def search_memory(self, query: str, memory_type: str = "all") -> List[Dict[str, Any]]:
         """
@@ -76,29 +583,85 @@ class MemoryManager:
         Args:
             query: Search query
             memory_type: Type of memory to search (short_term/long_term/all)
-            
+        
         Returns:
             List of relevant memory items
         """
         results = []
-        query_lower = query.lower()
         
         if memory_type in ["short_term", "all"]:
-            for item in self.short_term:
-                if query_lower in item.get("content", "").lower():
-                    results.append(item)
+            # Short-term memory is the tail of the interaction list
+            end = len(self.interactions)
+            recent_ids = range(end - len(self.short_term), end)
+            for idx in self._interaction_index.search(query, within=recent_ids):
+                results.append(self.interactions[idx])
         
         if memory_type in ["long_term", "all"]:
-            for key, value in self.long_term.items():
-                if query_lower in key.lower() or query_lower in str(value).lower():
-                    results.append({
-                        "type": "long_term",
-                        "key": key,
-                        "value": value
-                    })
+            for key in self._long_term_index.search(query):
+                results.append({
+                    "type": "long_term",
+                    "key": key,
+                    "value": self.long_term[key]
+                })
         
         return results
     
+    def search_history(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Search the full interaction history
+        
+        With a SQLite store this is an FTS5 full-text search ranked by relevance;
+        otherwise it is a case-insensitive substring search in insertion order.
+        
+        Args:
+            query: Search query
+            limit: Maximum number of results
+        """
+        if self._store is not None:
+            indices = self._store.search(query, limit)
+        else:
+            indices = self._interaction_index.search(query)[:limit]
+        return [self.interactions[idx] for idx in indices if idx < len(self.interactions)]
+    
+    def _remember(self, key: str, value: Dict[str, Any]):
+        """
+        Store an entry in long-term memory and index it for search
+        """
+        if key not in self.long_term:
+            kind = key.partition("_")[0]
+            if kind in self._counts:
+                self._counts[kind] += 1
+        self.long_term[key] = value
+        self._long_term_index.add(key, key, str(value))
+    
+    def _rebuild_indexes(self):
+        """
+        Rebuild the search indexes from the stored memory
+        """
+        self._interaction_index.clear()
+        self._file_to_indices = {}
+        for idx, interaction in enumerate(self.interactions):
+            content = interaction.get("content", "")
+            self._interaction_index.add(idx, content)
+            self._index_paths(idx, content)
+        
+        self._long_term_index.clear()
+        self._counts = dict.fromkeys(_COUNTED_KINDS, 0)
+        for key, value in self.long_term.items():
+            self._long_term_index.add(key, key, str(value))
+            kind = key.partition("_")[0]
+            if kind in self._counts:
+                self._counts[kind] += 1
+    
+    def _index_paths(self, idx: int, content: str):
+        """
+        Record the file paths mentioned by an interaction
+        """
+        if "." not in content:
+            return
+        for path in {os.path.normpath(p) for p in _PATH_RE.findall(content)}:
+            self._file_to_indices.setdefault(path, []).append(idx)
+    
     def _extract_to_long_term(self, interaction: Dict[str, Any]):
         """
         Extract important information to long-term memory
@@ -107,51 +670,51 @@ class MemoryManager:
         
         # Extract file paths
         if "/" in content or "\\" in content:
-            import re
-            paths = re.findall(r'[./\\]?[\w./\\-]+\.\w+', content)
-            for path in paths:
-                self.long_term[f"file_{path}"] = {
+            for path in _PATH_RE.findall(content):
+                self._remember(f"file_{path}", {
                     "last_mentioned": interaction["timestamp"],
                     "context": content[:100]
-                }
+                })
         
-        # Extract function/class definitions
+        # Extract function/class definitions in a single scan
         if "def " in content or "class " in content:
-            import re
-            functions = re.findall(r'def\s+(\w+)', content)
-            classes = re.findall(r'class\s+(\w+)', content)
+            functions = []
+            classes = []
+            for match in _DEF_RE.finditer(content):
+                if match.group(1) == "def":
+                    functions.append(match.group(2))
+                else:
+                    classes.append(match.group(2))
             
             for func in functions:
-                self.long_term[f"function_{func}"] = {
+                self._remember(f"function_{func}", {
                     "defined_at": interaction["timestamp"],
                     "type": "function"
-                }
+                })
             
             for cls in classes:
-                self.long_term[f"class_{cls}"] = {
+                self._remember(f"class_{cls}", {
                     "defined_at": interaction["timestamp"],
                     "type": "class"
-                }
+                })
         
         # Extract error messages
-        if "error" in content.lower() or "exception" in content.lower():
-            error_key = f"error_{len([k for k in self.long_term if k.startswith('error_')])}"
-            self.long_term[error_key] = {
+        content_lower = content.lower()
+        if "error" in content_lower or "exception" in content_lower:
+            error_key = f"error_{self._counts['error']}"
+            self._remember(error_key, {
                 "timestamp": interaction["timestamp"],
                 "content": content[:200]
-            }
+            })
     
     def get_file_history(self, file_path: str) -> List[Dict[str, Any]]:
         """
         Get history related to a specific file
-        """
-        history = []
-        
-        for interaction in self.interactions:
-            if file_path in interaction.get("content", ""):
-                history.append(interaction)
         
-        return history
+        Paths are normalized, so "./src/a.py" and "src/a.py" refer to the same file.
+        """
+        indices = self._file_to_indices.get(os.path.normpath(file_path), ())
+        return [self.interactions[idx] for idx in indices]
     
     def get_error_history(self) -> List[Dict[str, Any]]:
         """
@@ -171,33 +734,73 @@ class MemoryManager:
         """
         return {
             "total_interactions": len(self.interactions),
-            "files_mentioned": len([k for k in self.long_term if k.startswith("file_")]),
-            "functions_defined": len([k for k in self.long_term if k.startswith("function_")]),
-            "classes_defined": len([k for k in self.long_term if k.startswith("class_")]),
-            "errors_encountered": len([k for k in self.long_term if k.startswith("error_")]),
+            "files_mentioned": self._counts["file"],
+            "functions_defined": self._counts["function"],
+            "classes_defined": self._counts["class"],
+            "errors_encountered": self._counts["error"],
             "session_start": self.interactions[0]["timestamp"] if self.interactions else None,
             "last_interaction": self.interactions[-1]["timestamp"] if self.interactions else None
         }
     
+    def summarize_session_json(self) -> bytes:
+        """
+        Get the session summary encoded as JSON bytes, cached until memory changes
+        """
+        return self._cached_json("summary", self.summarize_session)
+    
+    @property
+    def _interactions_path(self) -> Path:
+        """Append-only JSON lines log stored next to the persistence file"""
+        return self.persistence_path.with_name(self.persistence_path.name + ".interactions.jsonl")
+    
     def save_memory(self):
         """
         Save memory to disk
+        
+        Long-term memory is rewritten as a single JSON document, while
+        interactions are appended to a JSON lines log so that each save only
+        writes the interactions added since the previous one.
         """
         if not self.persistence_path:
             return
         
+        if self._store is not None:
+            # Interactions were already written as they were added
+            self._store.set_state({
+                "long_term": self.long_term,
+                "summaries": self._summaries,
+                "summarized_upto": self._summarized_upto
+            })
+            logger.info("Memory saved to %s", self.persistence_path)
+            return
+        
         self.persistence_path.parent.mkdir(parents=True, exist_ok=True)
         
         memory_data = {
             "long_term": self.long_term,
-            "interactions": self.interactions,
+            "summaries": self._summaries,
+            "summarized_upto": self._summarized_upto,
             "timestamp": datetime.now().isoformat()
         }
         
         with open(self.persistence_path, 'wb') as f:
-            pickle.dump(memory_data, f)
+            f.write(_dumps(memory_data))
+        
+        if self._rewrite_log:
+            self._persisted_count = 0
+            mode = 'wb'
+        else:
+            mode = 'ab'
         
-        logger.info(f"Memory saved to {self.persistence_path}")
+        with open(self._interactions_path, mode) as f:
+            f.write(b"".join(
+                _dumps(interaction) + b"\n"
+                for interaction in self.interactions[self._persisted_count:]
+            ))
+        self._persisted_count = len(self.interactions)
+        self._rewrite_log = False
+        
+        logger.info("Memory saved to %s", self.persistence_path)
     
     def load_memory(self):
         """
@@ -207,41 +810,96 @@ class MemoryManager:
             return
         
         try:
-            with open(self.persistence_path, 'rb') as f:
-                memory_data = pickle.load(f)
+            if self._store is not None:
+                memory_data = {
+                    "long_term": self._store.get_state("long_term", {}),
+                    "summaries": self._store.get_state("summaries", []),
+                    "summarized_upto": self._store.get_state("summarized_upto", 0)
+                }
+                interactions = self._store.load_interactions()
+                rewrite = False
+            else:
+                data = self.persistence_path.read_bytes()
+                if data[:1] == b"\x80":
+                    # Files written before the switch to JSON are pickles
+                    memory_data = pickle.loads(data)
+                    interactions = memory_data.get("interactions", [])
+                    rewrite = True
+                    logger.info("Loaded legacy pickle memory; it will be rewritten as JSON on next save")
+                else:
+                    memory_data = _loads(data) if data else {}
+                    interactions = []
+                    log_path = self._interactions_path
+                    if log_path.exists():
+                        interactions = [
+                            _loads(line) for line in log_path.read_bytes().splitlines() if line
+                        ]
+                    rewrite = False
             
             self.long_term = memory_data.get("long_term", {})
-            self.interactions = memory_data.get("interactions", [])
+            self._summaries = memory_data.get("summaries", [])
+            self._summarized_upto = memory_data.get("summarized_upto", 0)
+            self._generation += 1
+            self.interactions = interactions
+            self._persisted_count = len(interactions)
+            self._rewrite_log = rewrite
+            self._rebuild_indexes()
+            self._rebuild_working_context()
+            self._invalidate_json()
             
-            # Rebuild short-term memory from recent interactions
-            for interaction in self.interactions[-self.short_term.maxlen:]:
-                self.short_term.append(interaction)
-            
-            logger.info(f"Memory loaded from {self.persistence_path}")
+            logger.info("Memory loaded from %s", self.persistence_path)
         except Exception as e:
-            logger.error(f"Failed to load memory: {e}")
+            logger.error("Failed to load memory: %s", e)
     
     def clear(self):
         """
         Clear all memory
         """
-        self.short_term.clear()
         self.long_term.clear()
         self.interactions.clear()
+        if self._store is not None:
+            self._store.clear()
+        self._interaction_index.clear()
+        self._long_term_index.clear()
+        self._file_to_indices.clear()
+        self._counts = dict.fromkeys(_COUNTED_KINDS, 0)
+        self._token_counts.clear()
+        self._added_at.clear()
+        self._working.clear()
+        self._running_tokens = 0
+        self._summaries = []
+        self._summarized_upto = 0
+        self._generation += 1
+        self._invalidate_json()
+        self._rewrite_log = True
         logger.info("Memory cleared")
     
-    def export_to_json(self, file_path: str):
+    async def export_to_json(self, file_path: str, max_recent: Optional[int] = None):
         """
         Export memory to JSON format
+        
+        Args:
+            file_path: Destination file
+            max_recent: Optional cap on the number of recent interactions included
         """
+        recent_context = self.short_term
+        if max_recent is not None:
+            recent_context = recent_context[-max_recent:] if max_recent > 0 else []
+        
         export_data = {
             "summary": self.summarize_session(),
-            "recent_context": list(self.short_term),
+            "recent_context": recent_context,
             "long_term_keys": list(self.long_term.keys()),
             "interactions_count": len(self.interactions)
         }
         
-        with open(file_path, 'w') as f:
-            json.dump(export_data, f, indent=2, default=str)
+        data = _dumps_indented(export_data)
+        
+        # Write without blocking the event loop
+        if aiofiles is not None:
+            async with aiofiles.open(file_path, 'wb') as f:
+                await f.write(data)
+        else:
+            await asyncio.to_thread(Path(file_path).write_bytes, data)
         
-        logger.info(f"Memory exported to {file_path}")
\ No newline at end of file
+        logger.info("Memory exported to %s", file_path)
@@ -0,0 +1,165 @@
+"""
+SQLite Interaction Store for Devon Agent Memory
+"""
+
+from typing import List, Dict, Any
+from pathlib import Path
+import json
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Persistence paths with these suffixes are stored in SQLite
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+class SQLiteInteractionStore:
+    """
+    Durable interaction log and memory state backed by SQLite
+    
+    Interactions are appended with a single INSERT each, so persisting never
+    rewrites history. When the SQLite build includes FTS5, an external-content
+    full-text index over interaction contents is kept in sync by triggers.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (or create) the store
+        
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS interactions ("
+            "id INTEGER PRIMARY KEY, ts TEXT, role TEXT, content TEXT, meta TEXT)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.has_fts = self._create_fts()
+    
+    def _create_fts(self) -> bool:
+        """Create the full-text index and its sync triggers, if FTS5 is available"""
+        try:
+            self._db.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS interactions_fts
+                    USING fts5(content, content='interactions', content_rowid='id');
+                CREATE TRIGGER IF NOT EXISTS interactions_ai AFTER INSERT ON interactions BEGIN
+                    INSERT INTO interactions_fts(rowid, content) VALUES (new.id, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS interactions_ad AFTER DELETE ON interactions BEGIN
+                    INSERT INTO interactions_fts(interactions_fts, rowid, content)
+                        VALUES ('delete', old.id, old.content);
+                END;
+            """)
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning("SQLite FTS5 unavailable, falling back to LIKE search: %s", e)
+            return False
+    
+    def append(self, interaction: Dict[str, Any]):
+        """
+        Append one interaction
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO interactions (ts, role, content, meta) VALUES (?, ?, ?, ?)",
+                (
+                    interaction.get("timestamp"),
+                    interaction.get("role"),
+                    interaction.get("content", ""),
+                    json.dumps(interaction.get("metadata") or {}, default=str)
+                )
+            )
+    
+    def load_interactions(self) -> List[Dict[str, Any]]:
+        """
+        Load all interactions in insertion order
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT ts, role, content, meta FROM interactions ORDER BY id"
+            ).fetchall()
+        return [
+            {"timestamp": ts, "role": role, "content": content, "metadata": json.loads(meta)}
+            for ts, role, content, meta in rows
+        ]
+    
+    def search(self, query: str, limit: int = 20) -> List[int]:
+        """
+        Full-text search over interaction contents
+        
+        Returns:
+            Zero-based positions of matching interactions, best matches first
+        """
+        with self._lock:
+            if self.has_fts:
+                # Quote each term so user input is never parsed as FTS syntax
+                terms = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+                if not terms:
+                    return []
+                rows = self._db.execute(
+                    "SELECT rowid FROM interactions_fts WHERE interactions_fts MATCH ? "
+                    "ORDER BY rank LIMIT ?",
+                    (terms, limit)
+                ).fetchall()
+            else:
+                pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                rows = self._db.execute(
+                    "SELECT id FROM interactions WHERE content LIKE ? ESCAPE '\\' ORDER BY id LIMIT ?",
+                    (pattern, limit)
+                ).fetchall()
+            
+            if not rows:
+                return []
+            # Rows are only ever appended or all deleted, so ids are contiguous
+            (first_id,) = self._db.execute("SELECT MIN(id) FROM interactions").fetchone()
+        
+        return [row_id - first_id for (row_id,) in rows]
+    
+    def get_state(self, key: str, default: Any = None) -> Any:
+        """
+        Read a JSON-encoded state value
+        """
+        with self._lock:
+            row = self._db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else default
+    
+    def set_state(self, values: Dict[str, Any]):
+        """
+        Write JSON-encoded state values in one transaction
+        """
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value, default=str)) for key, value in values.items()]
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+    
+    def clear(self):
+        """
+        Delete all interactions and state
+        """
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM interactions")
+            self._db.execute("DELETE FROM state")
+            self._db.execute("COMMIT")
+    
+    def close(self):
+        """
+        Close the database connection
+        """
+        with self._lock:
+            self._db.close()
@@ -3,20 +3,151 @@ Task Planning Module for Devon Agent
 """
 
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from types import MappingProxyType
 import json
 import logging
+import re
+import sys
+
+from .cache import ResponseCache, PlanTemplateCache
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Static planner instructions. This must stay byte-identical between calls so
+# that provider-side prompt caching can reuse it; never interpolate timestamps,
+# ids or other per-request values here.
+PLANNER_SYSTEM_PROMPT = """You are Devon, an AI software engineering assistant.
+Break the user's request into a short, ordered list of concrete engineering tasks.
+Prefix tasks that can run alongside their neighbours with "[Parallel]".
+Respond with one task per line and nothing else."""
+
+_COMPLEX_KEYWORDS = frozenset({"implement", "refactor", "optimize", "migrate", "deploy"})
+_SIMPLE_KEYWORDS = frozenset({"fix", "add", "update", "change", "rename"})
+
+# Keyword scans compiled to single-pass alternations (matched against lowercased text)
+_COMPLEX_RE = re.compile("|".join(sorted(_COMPLEX_KEYWORDS)))
+_SIMPLE_RE = re.compile("|".join(sorted(_SIMPLE_KEYWORDS)))
+# Each lookahead scans the whole request, so the first alternative that
+# matches anywhere wins and the original keyword priority is preserved
+_PLAN_DISPATCH_RE = re.compile(
+    r"\A(?:(?=.*?(?P<test>test))|(?=.*?(?P<api>api))|(?=.*?(?P<bug>bug|fix)))",
+    re.DOTALL
+)
+
+# Static task templates, keyed by _PLAN_DISPATCH_RE group (None = no keyword)
+_SEQUENTIAL_TASKS = MappingProxyType({
+    "test": ("Analyze existing test coverage", "Write unit tests", "Run tests and verify"),
+    "api": ("Design API endpoints", "Implement API handlers", "Add API documentation"),
+    "bug": ("Identify the bug location", "Analyze root cause", "Implement fix", "Verify fix works"),
+    None: ("Understand requirements", "Implement solution", "Test implementation")
+})
+
+# High-level tasks already expanded with their subtasks
+_HIERARCHICAL_TASKS = (
+    "1. Analyze requirements",
+    "2. Design solution architecture",
+    "3. Implement core functionality",
+    "  - Set up project structure",
+    "  - Implement main logic",
+    "  - Add helper functions",
+    "4. Add error handling and edge cases",
+    "5. Write tests",
+    "  - Write unit tests",
+    "  - Write integration tests",
+    "6. Document implementation"
+)
+
+
+def _context_json(context: Dict[str, Any]) -> str:
+    """
+    Serialize planning context to compact JSON with sorted keys
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            context, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+    return json.dumps(context, sort_keys=True, default=str, separators=(",", ":"), ensure_ascii=False)
+
+
+@lru_cache(maxsize=4096)
+def _task_key(task: str) -> str:
+    """
+    Normalized, interned key used to detect duplicate tasks
+    """
+    return sys.intern(task.lower().strip())
+
+
+_STRATEGY_MAP = MappingProxyType({
+    "simple": "sequential",
+    "moderate": "parallel",
+    "complex": "hierarchical"
+})
+
+
+@lru_cache(maxsize=1024)
+def _complexity_of(request: str) -> str:
+    """
+    Classify a request as simple, moderate or complex, memoized on the raw request
+    """
+    # Simple heuristic based on request length and keywords
+    request_lower = request.lower()
+    
+    if _COMPLEX_RE.search(request_lower):
+        return "complex"
+    elif _SIMPLE_RE.search(request_lower):
+        return "simple"
+    elif len(request) > 200:
+        return "complex"
+    else:
+        return "moderate"
+
 
 @dataclass
 class TaskPlan:
-    """Represents a plan of tasks to execute"""
+    """
+    Represents a plan of tasks to execute
+    
+    deps[i] lists the indices of the tasks that task i depends on.
+    """
     tasks: List[str]
-    dependencies: Dict[str, List[str]]
+    deps: List[List[int]] = field(default_factory=list)
     estimated_time: Optional[float] = None
     complexity: Optional[str] = None
+    
+    @property
+    def dependencies(self) -> Dict[str, List[str]]:
+        """
+        Dependencies keyed by task text (legacy view of deps)
+        """
+        tasks = self.tasks
+        return {
+            tasks[i]: [tasks[j] for j in task_deps]
+            for i, task_deps in enumerate(self.deps) if task_deps
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TaskPlan":
+        """
+        Build a plan from asdict() output, including the legacy task-keyed form
+        """
+        data = dict(data)
+        legacy = data.pop("dependencies", None)
+        if "deps" not in data:
+            index = {}
+            deps = []
+            for i, task in enumerate(data["tasks"]):
+                deps.append([index[dep] for dep in (legacy or {}).get(task, ()) if dep in index])
+                index[task] = i
+            data["deps"] = deps
+        return cls(**data)
 
 
 class TaskPlanner:
@@ -24,8 +155,13 @@ class TaskPlanner:
     Responsible for breaking down user requests into actionable tasks
     """
     
-    def __init__(self, model: str = "gpt-4"):
+    def __init__(self, model: str = "gpt-4", cache: Optional[ResponseCache] = None,
+                 tool_specs: Optional[List[Dict[str, str]]] = None,
+                 template_cache: Optional[PlanTemplateCache] = None):
         self.model = model
+        self.cache = cache
+        self.template_cache = template_cache
+        self.static_prefix = self._build_static_prefix(tool_specs or [])
         self.planning_strategies = {
             "sequential": self._sequential_planning,
             "parallel": self._parallel_planning,
@@ -39,15 +175,34 @@ class TaskPlanner:
         Args:
             request: The user's request in natural language
             context: Additional context for planning
-            
+        
         Returns:
             A TaskPlan object with ordered tasks
         """
         logger.info("Creating execution plan...")
         
+        # Reuse a plan for an identical request and context
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(self.model, request, context)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached plan")
+                return TaskPlan.from_dict(cached)
+        
         # Analyze the request complexity
         complexity = self._analyze_complexity(request)
         
+        # Adapt the plan of a similar earlier request instead of planning from scratch
+        if self.template_cache is not None:
+            adapted = self.template_cache.get(request, complexity)
+            if adapted is not None:
+                logger.info("Using adapted plan template")
+                plan = TaskPlan.from_dict(adapted)
+                if cache_key is not None:
+                    self.cache.put(cache_key, adapted)
+                return plan
+        
         # Choose planning strategy based on complexity
         strategy = self._select_strategy(complexity)
         
@@ -55,46 +210,78 @@ class TaskPlanner:
         tasks = await self.planning_strategies[strategy](request, context)
         
         # Identify dependencies
-        dependencies = self._identify_dependencies(tasks)
+        deps = self._identify_dependencies(tasks)
         
         plan = TaskPlan(
             tasks=tasks,
-            dependencies=dependencies,
+            deps=deps,
             complexity=complexity
         )
         
-        logger.info(f"Plan created with {len(tasks)} tasks")
+        if cache_key is not None:
+            self.cache.put(cache_key, asdict(plan))
+        if self.template_cache is not None:
+            self.template_cache.put(request, asdict(plan), complexity)
+        
+        logger.info("Plan created with %d tasks", len(tasks))
         return plan
     
-    def _analyze_complexity(self, request: str) -> str:
+    @staticmethod
+    def _build_static_prefix(tool_specs: List[Dict[str, str]]) -> str:
         """
-        Analyze the complexity of a request
+        Join the system prompt and tool definitions into the fixed prompt prefix
+        """
+        if not tool_specs:
+            return PLANNER_SYSTEM_PROMPT
+        
+        tool_lines = [
+            f"- {spec['name']}: {spec['description']}"
+            for spec in sorted(tool_specs, key=lambda spec: spec["name"])
+        ]
+        return PLANNER_SYSTEM_PROMPT + "\n\nAvailable tools:\n" + "\n".join(tool_lines)
+    
+    def build_messages(self, request: str, context: Dict[str, Any] = None,
+                       cache_control: bool = True) -> List[Dict[str, Any]]:
+        """
+        Build chat messages for an LLM planning call
+        
+        The static prefix comes first so providers can cache it (OpenAI caches
+        long identical prefixes automatically; Anthropic honours the
+        cache_control marker), and only the request and context follow it.
+        
+        Args:
+            request: The user's request in natural language
+            context: Additional context for planning
+            cache_control: Whether to mark the static block as cacheable
+        
+        Returns:
+            A list of chat messages
         """
-        # Simple heuristic based on request length and keywords
-        complex_keywords = ["implement", "refactor", "optimize", "migrate", "deploy"]
-        simple_keywords = ["fix", "add", "update", "change", "rename"]
+        system_block = {"type": "text", "text": self.static_prefix}
+        if cache_control:
+            system_block["cache_control"] = {"type": "ephemeral"}
         
-        request_lower = request.lower()
+        user_content = request
+        if context:
+            context_json = _context_json(context)
+            user_content = f"Context:\n{context_json}\n\nRequest:\n{request}"
         
-        if any(keyword in request_lower for keyword in complex_keywords):
-            return "complex"
-        elif any(keyword in request_lower for keyword in simple_keywords):
-            return "simple"
-        elif len(request) > 200:
-            return "complex"
-        else:
-            return "moderate"
+        return [
+            {"role": "system", "content": [system_block]},
+            {"role": "user", "content": user_content}
+        ]
+    
+    def _analyze_complexity(self, request: str) -> str:
+        """
+        Analyze the complexity of a request
+        """
+        return _complexity_of(request)
     
     def _select_strategy(self, complexity: str) -> str:
         """
         Select planning strategy based on complexity
         """
-        strategy_map = {
-            "simple": "sequential",
-            "moderate": "parallel",
-            "complex": "hierarchical"
-        }
-        return strategy_map.get(complexity, "sequential")
+        return _STRATEGY_MAP.get(complexity, "sequential")
     
     async def _sequential_planning(self, request: str, context: Dict[str, Any] = None) -> List[str]:
         """
@@ -102,27 +289,10 @@ class TaskPlanner:
         """
         # For now, using a simple template-based approach
         # In production, this would use the LLM
-        tasks = []
-        
-        if "test" in request.lower():
-            tasks.append("Analyze existing test coverage")
-            tasks.append("Write unit tests")
-            tasks.append("Run tests and verify")
-        elif "api" in request.lower():
-            tasks.append("Design API endpoints")
-            tasks.append("Implement API handlers")
-            tasks.append("Add API documentation")
-        elif "bug" in request.lower() or "fix" in request.lower():
-            tasks.append("Identify the bug location")
-            tasks.append("Analyze root cause")
-            tasks.append("Implement fix")
-            tasks.append("Verify fix works")
-        else:
-            tasks.append("Understand requirements")
-            tasks.append("Implement solution")
-            tasks.append("Test implementation")
-        
-        return tasks
+        match = _PLAN_DISPATCH_RE.match(request.lower())
+        kind = match.lastgroup if match else None
+        
+        return list(_SEQUENTIAL_TASKS[kind])
     
     async def _parallel_planning(self, request: str, context: Dict[str, Any] = None) -> List[str]:
         """
@@ -131,10 +301,13 @@ class TaskPlanner:
         # Similar to sequential but with parallelizable tasks
         tasks = await self._sequential_planning(request, context)
         
-        # Mark certain tasks as parallelizable (simplified)
+        # Mark certain tasks as parallelizable (simplified); tasks that run or
+        # verify earlier work stay serial so they follow what they check
         parallel_tasks = []
-        for i, task in enumerate(tasks):
-            if "test" in task.lower() or "document" in task.lower():
+        for task in tasks:
+            task_lower = task.lower()
+            verifies = "verify" in task_lower or task_lower.startswith("run ")
+            if ("test" in task_lower or "document" in task_lower) and not verifies:
                 parallel_tasks.append(f"[Parallel] {task}")
             else:
                 parallel_tasks.append(task)
@@ -145,64 +318,91 @@ class TaskPlanner:
         """
         Create a hierarchical plan with main tasks and subtasks
         """
-        # Break down into high-level tasks first
-        high_level_tasks = [
-            "1. Analyze requirements",
-            "2. Design solution architecture",
-            "3. Implement core functionality",
-            "4. Add error handling and edge cases",
-            "5. Write tests",
-            "6. Document implementation"
-        ]
+        # High-level tasks with their subtasks (simplified, static expansion)
+        return list(_HIERARCHICAL_TASKS)
+    
+    def _identify_dependencies(self, tasks: List[str]) -> List[List[int]]:
+        """
+        Identify dependencies between tasks, as predecessor indices per task
         
-        # Expand each high-level task (simplified)
-        detailed_tasks = []
-        for task in high_level_tasks:
-            detailed_tasks.append(task)
-            if "Implement" in task:
-                detailed_tasks.append("  - Set up project structure")
-                detailed_tasks.append("  - Implement main logic")
-                detailed_tasks.append("  - Add helper functions")
-            elif "test" in task.lower():
-                detailed_tasks.append("  - Write unit tests")
-                detailed_tasks.append("  - Write integration tests")
+        A run of consecutive [Parallel] tasks forms one stage: its tasks run
+        alongside each other after the previous serial task, and the next
+        serial task waits for all of them.
+        """
+        deps = []
         
-        return detailed_tasks
+        last_serial = None
+        siblings = []
+        for i, task in enumerate(tasks):
+            stage = [last_serial] if last_serial is not None else []
+            if task.startswith("[Parallel]"):
+                deps.append(stage)
+                siblings.append(i)
+            else:
+                deps.append(stage + siblings)
+                last_serial = i
+                siblings = []
+        
+        return deps
     
-    def _identify_dependencies(self, tasks: List[str]) -> Dict[str, List[str]]:
+    @staticmethod
+    def topological_order(plan: TaskPlan) -> List[int]:
         """
-        Identify dependencies between tasks
+        Order task indices so every task follows its dependencies
+        
+        Uses Kahn's algorithm over the index-based deps, so long dependency
+        chains need no recursion. Tasks caught in a cycle are appended in
+        plan order.
         """
-        dependencies = {}
+        count = len(plan.tasks)
+        indegree = [0] * count
+        successors = [[] for _ in range(count)]
+        for i, task_deps in enumerate(plan.deps[:count]):
+            for d in set(task_deps):
+                if 0 <= d < count and d != i:
+                    successors[d].append(i)
+                    indegree[i] += 1
         
-        for i, task in enumerate(tasks):
-            deps = []
-            
-            # Simple heuristic: tasks depend on previous non-parallel tasks
-            if i > 0 and not task.startswith("[Parallel]"):
-                for j in range(i - 1, -1, -1):
-                    if not tasks[j].startswith("[Parallel]"):
-                        deps.append(tasks[j])
-                        break
-            
-            if deps:
-                dependencies[task] = deps
-        
-        return dependencies
+        queue = deque(i for i in range(count) if indegree[i] == 0)
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for j in successors[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    queue.append(j)
+        
+        if len(order) < count:
+            logger.warning("Plan dependencies contain a cycle; keeping plan order for the rest")
+            placed = set(order)
+            order.extend(i for i in range(count) if i not in placed)
+        return order
     
     def optimize_plan(self, plan: TaskPlan) -> TaskPlan:
         """
         Optimize a plan for better execution
         """
-        # Remove redundant tasks
+        # Remove redundant tasks, mapping each duplicate onto the task it repeats
         unique_tasks = []
-        seen = set()
+        kept = []
+        first_index = {}
+        remap = []
         
-        for task in plan.tasks:
-            task_key = task.lower().strip()
-            if task_key not in seen:
+        for i, task in enumerate(plan.tasks):
+            task_key = _task_key(task)
+            if task_key not in first_index:
+                first_index[task_key] = len(unique_tasks)
                 unique_tasks.append(task)
-                seen.add(task_key)
+                kept.append(i)
+            remap.append(first_index[task_key])
+        
+        deps = plan.deps
+        unique_deps = []
+        for new_index, old_index in enumerate(kept):
+            task_deps = deps[old_index] if old_index < len(deps) else ()
+            unique_deps.append(sorted({remap[d] for d in task_deps} - {new_index}))
         
         plan.tasks = unique_tasks
+        plan.deps = unique_deps
         return plan
\ No newline at end of file
@@ -3,10 +3,14 @@ Tool Management Module for Devon Agent
 """
 
 import os
-import subprocess
-import requests
-import json
-from typing import Dict, Any, List, Optional, Callable
+import copy
+import base64
+import shlex
+import signal
+import fnmatch
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from pathlib import Path
 import logging
 import ast
@@ -14,10 +18,84 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# AST node type -> metric counted by CodeAnalysisTool
+_NODE_METRICS = {
+    ast.FunctionDef: "functions",
+    ast.AsyncFunctionDef: "functions",
+    ast.ClassDef: "classes",
+    ast.Import: "imports",
+    ast.ImportFrom: "imports"
+}
+
+
+async def _run_process(argv: Optional[List[str]] = None, command: Optional[str] = None,
+                       cwd: Optional[Path] = None, timeout: Optional[float] = None):
+    """
+    Run a process without blocking the event loop
+    
+    Runs argv directly, or command through the shell when no argv is given.
+    The process runs in its own session; if it outlives the timeout its whole
+    process group is killed (so shell children cannot hold the pipes open)
+    and asyncio.TimeoutError is raised.
+    
+    Returns:
+        Tuple of (return code, stdout, stderr)
+    """
+    options = dict(
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        start_new_session=os.name == "posix"
+    )
+    if argv is not None:
+        proc = await asyncio.create_subprocess_exec(*argv, **options)
+    else:
+        proc = await asyncio.create_subprocess_shell(command, **options)
+    
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except ProcessLookupError:
+            pass
+        await proc.wait()
+        raise
+    
+    return (
+        proc.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace")
+    )
+
+
+def _split_files(files) -> List[str]:
+    """Split a shell-style file list string; lists are used as given"""
+    return shlex.split(files) if isinstance(files, str) else list(files)
+
+
+# Conservative git remote/branch name: no leading '-' (option injection),
+# no '..', '@{', '//', trailing '/', '.' or '.lock'
+_GIT_NAME_RE = re.compile(r"(?!-)(?!.*\.\.)(?!.*@\{)(?!.*//)[A-Za-z0-9._/@-]+(?<![./])(?<!\.lock)")
+
+
+def _git_name(value: Any, kind: str) -> str:
+    """Validate a remote or branch name before it is passed to git"""
+    if not isinstance(value, str) or not _GIT_NAME_RE.fullmatch(value):
+        raise ValueError(f"Invalid git {kind} name: {value!r}")
+    return value
+
 
 class Tool:
     """Base class for all tools"""
     
+    # Built-in tools declare these so they can be listed without being constructed
+    NAME = ""
+    DESCRIPTION = ""
+    
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
@@ -30,12 +108,14 @@ class Tool:
 class FileSystemTool(Tool):
     """Tool for file system operations"""
     
+    NAME = "filesystem"
+    DESCRIPTION = "Perform file system operations (read, write, list, search)"
+    
     def __init__(self, workspace_path: str):
-        super().__init__(
-            "filesystem",
-            "Perform file system operations (read, write, list, search)"
-        )
+        super().__init__(self.NAME, self.DESCRIPTION)
         self.workspace_path = Path(workspace_path)
+        # String form of the workspace for os.path joins
+        self._ws_str = os.fspath(self.workspace_path)
     
     async def execute(self, operation: str, **kwargs) -> Dict[str, Any]:
         """Execute file system operation"""
@@ -57,43 +137,106 @@ class FileSystemTool(Tool):
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def _read_file(self, path: str) -> str:
-        """Read file contents"""
-        file_path = self.workspace_path / path
-        with open(file_path, 'r') as f:
-            return f.read()
+    def _resolve(self, path: str) -> str:
+        """
+        Join a workspace-relative path onto the workspace
+        
+        Raises ValueError if the result (e.g. an absolute path or one climbing
+        out through "..") is not inside the workspace.
+        """
+        full_path = os.path.join(self._ws_str, path)
+        rel_path = os.path.relpath(full_path, self._ws_str)
+        if rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep):
+            raise ValueError(f"Path is outside the workspace: {path}")
+        return full_path
+    
+    def _read_file(self, path: str, binary: bool = False):
+        """
+        Read file contents as UTF-8 text
+        
+        With binary set, returns {"content": <base64 text>, "encoding": "base64"}
+        so the result stays JSON serializable.
+        """
+        data = self._read_file_bytes(path)
+        if binary:
+            return {"content": base64.b64encode(data).decode("ascii"), "encoding": "base64"}
+        
+        text = data.decode("utf-8")
+        if "\r" in text:
+            # Match text-mode universal newline handling
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+    
+    def _read_file_bytes(self, path: str) -> bytes:
+        """Read raw file contents with pre-sized reads on the file descriptor"""
+        fd = os.open(self._resolve(path), os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            chunks = [os.read(fd, size)]
+            # Reads can come up short on very large or growing files
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+                chunks.append(chunk)
+        finally:
+            os.close(fd)
     
     def _write_file(self, path: str, content: str) -> str:
         """Write content to file"""
-        file_path = self.workspace_path / path
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, 'w') as f:
+        file_path = self._resolve(path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
         return f"Written to {path}"
     
     def _list_directory(self, path: str = ".") -> List[str]:
         """List directory contents"""
-        dir_path = self.workspace_path / path
-        return [str(p.relative_to(self.workspace_path)) for p in dir_path.iterdir()]
+        dir_path = self._resolve(path)
+        
+        # Resolve the directory's relative path once instead of once per entry
+        rel_dir = os.path.relpath(dir_path, self._ws_str)
+        if rel_dir == ".":
+            rel_dir = ""
+        
+        with os.scandir(dir_path) as entries:
+            return [os.path.join(rel_dir, entry.name) for entry in entries]
     
-    def _search_files(self, pattern: str) -> List[str]:
-        """Search for files matching pattern"""
+    def _search_files(self, pattern: str, max_results: Optional[int] = None) -> List[str]:
+        """Search for files matching pattern, stopping after max_results matches"""
         matches = []
-        for path in self.workspace_path.rglob(pattern):
-            matches.append(str(path.relative_to(self.workspace_path)))
+        if "/" in pattern or os.sep in pattern or "**" in pattern:
+            if os.path.isabs(pattern) or os.pardir in Path(pattern).parts:
+                raise ValueError(f"Pattern is outside the workspace: {pattern}")
+            # Path patterns need pathlib's segment-aware glob semantics
+            for path in self.workspace_path.rglob(pattern):
+                if len(matches) == max_results:
+                    break
+                matches.append(str(path.relative_to(self.workspace_path)))
+            return matches
+        
+        # Plain name patterns: one compiled regex over os.walk's names
+        match = re.compile(fnmatch.translate(pattern)).match
+        for root, dirnames, filenames in os.walk(self._ws_str):
+            rel_root = os.path.relpath(root, self._ws_str)
+            for names in (dirnames, filenames):
+                for name in names:
+                    if match(name):
+                        if len(matches) == max_results:
+                            return matches
+                        matches.append(name if rel_root == "." else os.path.join(rel_root, name))
         return matches
     
     def _create_directory(self, path: str) -> str:
         """Create directory"""
-        dir_path = self.workspace_path / path
-        dir_path.mkdir(parents=True, exist_ok=True)
+        os.makedirs(self._resolve(path), exist_ok=True)
         return f"Created directory: {path}"
     
     def _delete_file(self, path: str) -> str:
         """Delete file"""
-        file_path = self.workspace_path / path
-        if file_path.exists():
-            file_path.unlink()
+        file_path = self._resolve(path)
+        if os.path.exists(file_path):
+            os.unlink(file_path)
             return f"Deleted: {path}"
         return f"File not found: {path}"
 
@@ -101,19 +244,37 @@ class FileSystemTool(Tool):
 class CodeAnalysisTool(Tool):
     """Tool for analyzing code"""
     
-    def __init__(self):
-        super().__init__(
-            "code_analysis",
-            "Analyze code for issues, complexity, and suggestions"
-        )
+    NAME = "code_analysis"
+    DESCRIPTION = "Analyze code for issues, complexity, and suggestions"
+    
+    def __init__(self, cache_size: int = 256):
+        super().__init__(self.NAME, self.DESCRIPTION)
+        # Analyses of recently seen snippets, least recently used first
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
     
     async def execute(self, code: str, language: str = "python") -> Dict[str, Any]:
         """Analyze code"""
         if language == "python":
-            return self._analyze_python(code)
+            return self._analyze_python_cached(code)
         else:
             return {"success": False, "error": f"Unsupported language: {language}"}
     
+    def _analyze_python_cached(self, code: str) -> Dict[str, Any]:
+        """Analyze Python code, reusing the analysis of an identical snippet"""
+        # The snippet itself is the key: its hash is cached by str, and equality
+        # is checked on lookup so hash collisions can never return a wrong result
+        cached = self._cache.get(code)
+        if cached is None:
+            cached = self._analyze_python(code)
+            self._cache[code] = cached
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(code)
+        # Callers may mutate the result, so never hand out the cached dict
+        return copy.deepcopy(cached)
+    
     def _analyze_python(self, code: str) -> Dict[str, Any]:
         """Analyze Python code"""
         try:
@@ -131,23 +292,25 @@ class CodeAnalysisTool(Tool):
                 "suggestions": []
             }
             
+            metrics = analysis["metrics"]
+            bare_except = False
             for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    analysis["metrics"]["functions"] += 1
-                elif isinstance(node, ast.ClassDef):
-                    analysis["metrics"]["classes"] += 1
-                elif isinstance(node, (ast.Import, ast.ImportFrom)):
-                    analysis["metrics"]["imports"] += 1
+                node_type = type(node)
+                metric = _NODE_METRICS.get(node_type)
+                if metric is not None:
+                    metrics[metric] += 1
+                # Check for common issues in the same pass
+                elif node_type is ast.ExceptHandler and node.type is None:
+                    bare_except = True
             
-            # Check for common issues
-            if "except:" in code:
+            if bare_except:
                 analysis["issues"].append("Bare except clause detected")
             
             if analysis["metrics"]["functions"] > 10:
                 analysis["suggestions"].append("Consider splitting into multiple modules")
             
             return analysis
-            
+        
         except SyntaxError as e:
             return {
                 "success": False,
@@ -159,32 +322,39 @@ class CodeAnalysisTool(Tool):
 class ShellCommandTool(Tool):
     """Tool for executing shell commands"""
     
+    NAME = "shell"
+    DESCRIPTION = "Execute shell commands"
+    
     def __init__(self, workspace_path: str):
-        super().__init__(
-            "shell",
-            "Execute shell commands"
-        )
+        super().__init__(self.NAME, self.DESCRIPTION)
         self.workspace_path = Path(workspace_path)
+        self._ws_str = os.fspath(self.workspace_path)
     
-    async def execute(self, command: str, timeout: int = 30) -> Dict[str, Any]:
-        """Execute shell command"""
+    async def execute(self, command: Optional[str] = None, timeout: int = 30,
+                      argv: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Execute shell command
+        
+        Args:
+            command: Command line interpreted by the shell
+            timeout: Seconds before the command is aborted
+            argv: Program and arguments run directly, without a shell (takes precedence)
+        """
+        if argv is None and command is None:
+            return {"success": False, "error": "Either command or argv is required"}
+        
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                cwd=self.workspace_path
+            return_code, stdout, stderr = await _run_process(
+                argv, command, cwd=self._ws_str, timeout=timeout
             )
             
             return {
-                "success": result.returncode == 0,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "return_code": result.returncode
+                "success": return_code == 0,
+                "stdout": stdout,
+                "stderr": stderr,
+                "return_code": return_code
             }
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {
                 "success": False,
                 "error": f"Command timed out after {timeout} seconds"
@@ -199,11 +369,11 @@ class ShellCommandTool(Tool):
 class WebSearchTool(Tool):
     """Tool for searching the web"""
     
+    NAME = "web_search"
+    DESCRIPTION = "Search the web for information"
+    
     def __init__(self, api_key: Optional[str] = None):
-        super().__init__(
-            "web_search",
-            "Search the web for information"
-        )
+        super().__init__(self.NAME, self.DESCRIPTION)
         self.api_key = api_key
     
     async def execute(self, query: str, num_results: int = 5) -> Dict[str, Any]:
@@ -224,44 +394,55 @@ class WebSearchTool(Tool):
 class GitTool(Tool):
     """Tool for Git operations"""
     
+    NAME = "git"
+    DESCRIPTION = "Perform Git operations"
+    
+    # Arguments are passed straight to git, never through a shell
+    _STATIC = {
+        "status": ("git", "status"),
+        "branch": ("git", "branch"),
+        "log": ("git", "log", "--oneline", "-10")
+    }
+    # User values are validated so none can be read as an option, and
+    # pathspecs follow '--'
+    _DYNAMIC = {
+        "add": lambda kw: ("git", "add", "--", *_split_files(kw.get('files', '.'))),
+        "commit": lambda kw: ("git", "commit", "-m", str(kw.get('message', 'Auto commit'))),
+        "push": lambda kw: (
+            "git", "push",
+            _git_name(kw.get('remote', 'origin'), "remote"), _git_name(kw.get('branch', 'main'), "branch")
+        ),
+        "pull": lambda kw: (
+            "git", "pull",
+            _git_name(kw.get('remote', 'origin'), "remote"), _git_name(kw.get('branch', 'main'), "branch")
+        ),
+        "checkout": lambda kw: ("git", "checkout", _git_name(kw.get('branch', 'main'), "branch"), "--")
+    }
+    
     def __init__(self, workspace_path: str):
-        super().__init__(
-            "git",
-            "Perform Git operations"
-        )
+        super().__init__(self.NAME, self.DESCRIPTION)
         self.workspace_path = Path(workspace_path)
+        self._ws_str = os.fspath(self.workspace_path)
     
     async def execute(self, operation: str, **kwargs) -> Dict[str, Any]:
         """Execute Git operation"""
-        operations = {
-            "status": "git status",
-            "add": f"git add {kwargs.get('files', '.')}",
-            "commit": f"git commit -m \"{kwargs.get('message', 'Auto commit')}\"",
-            "push": f"git push {kwargs.get('remote', 'origin')} {kwargs.get('branch', 'main')}",
-            "pull": f"git pull {kwargs.get('remote', 'origin')} {kwargs.get('branch', 'main')}",
-            "branch": "git branch",
-            "checkout": f"git checkout {kwargs.get('branch', 'main')}",
-            "log": "git log --oneline -10"
-        }
-        
-        if operation not in operations:
-            return {"success": False, "error": f"Unknown operation: {operation}"}
-        
-        command = operations[operation]
+        argv = self._STATIC.get(operation)
+        if argv is None:
+            build = self._DYNAMIC.get(operation)
+            if build is None:
+                return {"success": False, "error": f"Unknown operation: {operation}"}
+            try:
+                argv = build(kwargs)
+            except ValueError as e:
+                return {"success": False, "error": str(e)}
         
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd=self.workspace_path
-            )
+            return_code, stdout, stderr = await _run_process(argv, cwd=self._ws_str)
             
             return {
-                "success": result.returncode == 0,
-                "output": result.stdout,
-                "error": result.stderr
+                "success": return_code == 0,
+                "output": stdout,
+                "error": stderr
             }
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -272,57 +453,113 @@ class ToolManager:
     
     def __init__(self, workspace_path: str):
         self.workspace_path = Path(workspace_path)
+        # Constructed tools; built-in tools are only constructed on first use
         self.tools = {}
+        self._factories: Dict[str, Callable[[], Tool]] = {}
+        self._descriptions: Dict[str, str] = {}
+        # Descriptor list returned by list_tools, rebuilt after registrations
+        self._list_cache: Optional[List[Dict[str, str]]] = None
         
         # Initialize built-in tools
         self._initialize_tools()
     
     def _initialize_tools(self):
-        """Initialize built-in tools"""
-        self.register_tool(FileSystemTool(self.workspace_path))
-        self.register_tool(CodeAnalysisTool())
-        self.register_tool(ShellCommandTool(self.workspace_path))
-        self.register_tool(WebSearchTool())
-        self.register_tool(GitTool(self.workspace_path))
+        """Register factories for the built-in tools"""
+        workspace_path = self.workspace_path
+        self.register_factory(FileSystemTool, lambda: FileSystemTool(workspace_path))
+        self.register_factory(CodeAnalysisTool, CodeAnalysisTool)
+        self.register_factory(ShellCommandTool, lambda: ShellCommandTool(workspace_path))
+        self.register_factory(WebSearchTool, WebSearchTool)
+        self.register_factory(GitTool, lambda: GitTool(workspace_path))
     
     def register_tool(self, tool: Tool):
         """Register a new tool"""
         self.tools[tool.name] = tool
-        logger.info(f"Registered tool: {tool.name}")
+        self._factories.pop(tool.name, None)
+        self._descriptions[tool.name] = tool.description
+        self._list_cache = None
+        logger.info("Registered tool: %s", tool.name)
+    
+    def register_factory(self, tool_class: type, factory: Callable[[], Tool]):
+        """
+        Register a tool to be constructed on first use
+        
+        Args:
+            tool_class: Tool subclass providing NAME and DESCRIPTION
+            factory: Zero-argument callable returning the tool instance
+        """
+        self.tools.pop(tool_class.NAME, None)
+        self._factories[tool_class.NAME] = factory
+        self._descriptions[tool_class.NAME] = tool_class.DESCRIPTION
+        self._list_cache = None
+        logger.info("Registered tool: %s", tool_class.NAME)
+    
+    def _get_tool(self, tool_name: str) -> Optional[Tool]:
+        """Return a tool by name, constructing it on first use"""
+        tool = self.tools.get(tool_name)
+        if tool is None and tool_name in self._factories:
+            tool = self._factories[tool_name]()
+            self.tools[tool_name] = tool
+            del self._factories[tool_name]
+        return tool
     
     async def execute_tool(self, tool_name: str, **kwargs) -> Dict[str, Any]:
         """Execute a tool by name"""
-        if tool_name not in self.tools:
+        tool = self._get_tool(tool_name)
+        if tool is None:
             return {
                 "success": False,
                 "error": f"Tool not found: {tool_name}"
             }
         
-        tool = self.tools[tool_name]
-        logger.info(f"Executing tool: {tool_name}")
+        logger.info("Executing tool: %s", tool_name)
         
         try:
             result = await tool.execute(**kwargs)
             return result
         except Exception as e:
-            logger.error(f"Tool execution failed: {e}")
+            logger.error("Tool execution failed: %s", e)
             return {
                 "success": False,
                 "error": str(e)
             }
     
+    async def execute_tools(self, batch: List[Tuple[str, Dict[str, Any]]],
+                            concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        Execute independent tool calls concurrently
+        
+        Args:
+            batch: (tool name, keyword arguments) pairs
+            concurrency: Maximum number of calls in flight at once
+        
+        Returns:
+            One result per call, in batch order (execute_tool turns failures
+            into error results; cancellation propagates to the caller)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run(tool_name: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.execute_tool(tool_name, **kwargs)
+        
+        return list(await asyncio.gather(
+            *(run(tool_name, kwargs) for tool_name, kwargs in batch)
+        ))
+    
     def list_tools(self) -> List[Dict[str, str]]:
         """List all available tools"""
-        return [
-            {
-                "name": tool.name,
-                "description": tool.description
-            }
-            for tool in self.tools.values()
-        ]
+        if self._list_cache is None:
+            self._list_cache = [
+                {
+                    "name": name,
+                    "description": description
+                }
+                for name, description in self._descriptions.items()
+            ]
+        # Shallow copy so callers can reorder or extend the list freely
+        return list(self._list_cache)
     
     def get_tool_description(self, tool_name: str) -> Optional[str]:
         """Get description of a specific tool"""
-        if tool_name in self.tools:
-            return self.tools[tool_name].description
-        return None
\ No newline at end of file
+        return self._descriptions.get(tool_name)
\ No newline at end of file
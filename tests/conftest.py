@@ -0,0 +1,9 @@
+"""
+Shared test configuration for Devon Agent
+"""
+
+import sys
+from pathlib import Path
+
+# Make the devon_agent package importable when running `pytest tests/`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,18 @@
+"""
+Tests for the Devon Agent response caches
+"""
+
+from devon_agent.cache import PlanTemplateCache
+
+
+def test_plan_template_replaces_whole_tokens_only():
+    cache = PlanTemplateCache()
+    cache.put("Refactor class api in src/api.py", {
+        "tasks": ["Open src/api.py", "Make the api rapid", "Update myapi and api_v2"]
+    })
+    
+    plan = cache.get("Refactor class db in lib/db.py")
+    
+    assert plan == {
+        "tasks": ["Open lib/db.py", "Make the db rapid", "Update myapi and api_v2"]
+    }
@@ -0,0 +1,75 @@
+"""
+Tests for the Devon Agent core request processing
+"""
+
+import asyncio
+
+from devon_agent.core import DevonAgent, TaskTable, DONE, FAILED
+from devon_agent.planner import TaskPlan
+
+
+def test_concurrent_requests_report_their_own_tasks(tmp_path):
+    agent = DevonAgent(workspace_path=str(tmp_path))
+    
+    async def run_both():
+        return await asyncio.gather(
+            agent.process_request("Implement a cache layer"),
+            agent.process_request("Implement a cache layer")
+        )
+    
+    results = asyncio.run(run_both())
+    
+    for result in results:
+        assert result["success"]
+        response = result["response"]
+        assert response["successful_tasks"] == response["total_tasks"]
+    
+    # Together the two requests account for every task exactly once
+    total = sum(result["response"]["total_tasks"] for result in results)
+    assert len(agent.state.completed_tasks) == total
+
+
+def test_tasks_run_after_their_dependencies(tmp_path):
+    agent = DevonAgent(workspace_path=str(tmp_path))
+    
+    result = asyncio.run(agent.process_request("Fix the bug in parser"))
+    
+    assert result["success"]
+    # Sequential bug-fix plan: every task depends on the one before it
+    assert result["tasks_completed"] == [
+        "Identify the bug location",
+        "Analyze root cause",
+        "Implement fix",
+        "Verify fix works"
+    ]
+
+
+def test_parallel_tasks_wait_for_the_stage_before_them(tmp_path):
+    agent = DevonAgent(workspace_path=str(tmp_path))
+    
+    tests_result = asyncio.run(agent.process_request("Write tests for the api"))
+    assert tests_result["tasks_completed"][-1] == "Run tests and verify"
+    
+    moderate_result = asyncio.run(agent.process_request("Explain the design"))
+    # tasks_completed is cumulative across the agent's requests
+    completed = moderate_result["tasks_completed"]
+    assert completed[:len(tests_result["tasks_completed"])] == tests_result["tasks_completed"]
+    assert completed.index("Implement solution") < completed.index("[Parallel] Test implementation")
+
+
+def test_task_dependencies_drop_forward_references():
+    plan = TaskPlan(tasks=["a", "b", "c"], deps=[[1], [0], [0, 1, 5]])
+    
+    assert DevonAgent._task_dependencies(plan) == [[], [0], [0, 1]]
+
+
+def test_task_table_completed_in_finish_order():
+    table = TaskTable()
+    first = table.start_plan(["a", "b"])
+    second = table.start_plan(["c"])
+    table.set_status(second, DONE)
+    table.set_status(first + 1, FAILED)
+    table.set_status(first, DONE)
+    
+    assert table.completed() == ["c", "b", "a"]
+    assert table.pending() == []
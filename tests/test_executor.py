@@ -0,0 +1,75 @@
+"""
+Tests for the Devon Agent code executor
+"""
+
+import asyncio
+
+from devon_agent.executor import CodeExecutor
+
+
+class _RecordingExecutor(CodeExecutor):
+    """Executor whose test runs record how many overlap"""
+    
+    def __init__(self, workspace_path: str):
+        super().__init__(workspace_path)
+        self.active = 0
+        self.max_active = 0
+    
+    async def _run_tests(self, test_file):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return {"passed": True, "output": "", "errors": "", "command": "pytest"}
+
+
+def test_tasks_sharing_a_test_file_run_in_turn(tmp_path):
+    executor = _RecordingExecutor(str(tmp_path))
+    
+    async def run_all():
+        return await asyncio.gather(*(
+            executor.execute_task(task)
+            for task in ("Write unit tests", "Run tests and verify", "Write integration tests")
+        ))
+    
+    results = asyncio.run(run_all())
+    
+    assert all(result["success"] for result in results)
+    assert executor.max_active == 1
+
+
+def test_file_cache_is_bounded(tmp_path):
+    executor = CodeExecutor(str(tmp_path), file_cache_size=3)
+    for i in range(10):
+        (tmp_path / f"module_{i}.py").write_text(f"def f{i}():\n    return {i}\n")
+    
+    analysis = executor._analyze_codebase()
+    
+    assert analysis["file_count"] == 10
+    assert len(executor._file_cache) == 3
+    
+    # A cached file is refreshed once it changes on disk
+    path = next(iter(executor._file_cache))
+    path.write_text("x = 1  # changed\n")
+    assert executor._read_source(path) == "x = 1  # changed\n"
+
+
+def test_run_tests_reports_command_and_stops_on_timeout(tmp_path):
+    test_file = tmp_path / "test_slow.py"
+    test_file.write_text(
+        "import time\n"
+        "\n"
+        "def test_fast():\n"
+        "    assert True\n"
+        "\n"
+        "def test_slow():\n"
+        "    time.sleep(30)\n"
+    )
+    executor = CodeExecutor(str(tmp_path), test_timeout=5)
+    
+    result = asyncio.run(executor._run_tests(test_file))
+    
+    assert not result["passed"]
+    assert "timed out" in result["error"]
+    assert "test_fast PASSED" in result["output"]
+    assert result["command"].split()[1:3] == ["-m", "pytest"]
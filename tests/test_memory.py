@@ -0,0 +1,67 @@
+"""
+Tests for the Devon Agent memory manager
+"""
+
+import asyncio
+
+from devon_agent.memory import MemoryManager
+
+
+def test_consolidation_keeps_recent_interactions_raw():
+    async def fill():
+        memory = MemoryManager(consolidate_every=20, keep_recent=10)
+        for i in range(30):
+            memory.add_interaction("user", f"message {i}")
+            await asyncio.sleep(0)
+        await memory._consolidation_task
+        return memory
+    
+    memory = asyncio.run(fill())
+    
+    assert memory._summarized_upto == 20
+    context = memory.get_budgeted_context()
+    assert context[0]["content"].startswith("SUMMARY: ")
+    assert [entry["content"] for entry in context[1:]] == [f"message {i}" for i in range(20, 30)]
+
+
+def test_consolidation_is_deferred_without_event_loop():
+    memory = MemoryManager(consolidate_every=20, keep_recent=10)
+    for i in range(40):
+        memory.add_interaction("user", f"message {i}")
+    
+    assert memory._summarized_upto == 0
+    assert memory.get_budgeted_context()[-1]["content"] == "message 39"
+
+
+def test_json_view_encoded_during_an_update_is_not_cached():
+    memory = MemoryManager()
+    memory.add_interaction("user", "first")
+    original = memory.summarize_session
+    
+    def summarize_racing_an_update():
+        summary = original()
+        # Another thread adds an interaction while this view is being encoded
+        memory.add_interaction("user", "second")
+        return summary
+    
+    memory.summarize_session = summarize_racing_an_update
+    stale = memory.summarize_session_json()
+    memory.summarize_session = original
+    
+    assert b'"total_interactions":1' in stale
+    assert b'"total_interactions":2' in memory.summarize_session_json()
+
+
+def test_consolidation_and_token_counting_are_opt_in():
+    async def fill():
+        memory = MemoryManager()
+        for i in range(40):
+            memory.add_interaction("user", f"message {i}")
+            await asyncio.sleep(0)
+        return memory
+    
+    memory = asyncio.run(fill())
+    
+    assert memory._consolidation_task is None
+    assert memory._summarized_upto == 0
+    assert len(memory.get_budgeted_context()) == 40
@@ -0,0 +1,100 @@
+"""
+Tests for the Devon Agent tools
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from devon_agent.tools import FileSystemTool, GitTool, Tool, ToolManager
+
+
+def test_list_directory_stays_inside_workspace(tmp_path):
+    workspace = tmp_path / "workspace"
+    (workspace / "src").mkdir(parents=True)
+    (workspace / "src" / "app.py").write_text("")
+    tool = FileSystemTool(str(workspace))
+    
+    listing = asyncio.run(tool.execute("list", path="src"))
+    assert listing == {"success": True, "result": ["src/app.py"]}
+    
+    for outside in (str(tmp_path), "..", "src/../.."):
+        result = asyncio.run(tool.execute("list", path=outside))
+        assert not result["success"]
+        assert "outside the workspace" in result["error"]
+
+
+def test_file_operations_stay_inside_workspace(tmp_path):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    secret = tmp_path / "secret.txt"
+    secret.write_text("secret")
+    tool = FileSystemTool(str(workspace))
+    
+    for operation, kwargs in (
+        ("read", {"path": "../secret.txt"}),
+        ("read", {"path": str(secret)}),
+        ("write", {"path": "sub/../../secret.txt", "content": "overwritten"}),
+        ("delete", {"path": "../secret.txt"}),
+        ("create_dir", {"path": "../escaped"}),
+        ("search", {"pattern": "../*.txt"}),
+    ):
+        result = asyncio.run(tool.execute(operation, **kwargs))
+        assert not result["success"]
+        assert "outside the workspace" in result["error"]
+    
+    assert secret.read_text() == "secret"
+    assert not (tmp_path / "escaped").exists()
+    
+    asyncio.run(tool.execute("write", path="sub/notes.txt", content="kept"))
+    assert asyncio.run(tool.execute("read", path="sub/../sub/notes.txt"))["result"] == "kept"
+
+
+def test_git_rejects_option_like_names(tmp_path):
+    tool = GitTool(str(tmp_path))
+    marker = tmp_path / "injected"
+    
+    for operation, kwargs in (
+        ("pull", {"remote": f"--upload-pack=touch {marker}", "branch": "main"}),
+        ("push", {"remote": "origin", "branch": "--force"}),
+        ("checkout", {"branch": "-b"}),
+        ("checkout", {"branch": "a..b"}),
+    ):
+        result = asyncio.run(tool.execute(operation, **kwargs))
+        assert not result["success"]
+        assert result["error"].startswith("Invalid git")
+    
+    assert not marker.exists()
+
+
+def test_binary_read_is_json_serializable(tmp_path):
+    (tmp_path / "blob.bin").write_bytes(b"\x00\xffdata")
+    tool = FileSystemTool(str(tmp_path))
+    
+    result = asyncio.run(tool.execute("read", path="blob.bin", binary=True))
+    
+    assert result["success"]
+    assert json.loads(json.dumps(result))["result"] == {"content": "AP9kYXRh", "encoding": "base64"}
+
+
+class _CancelledTool(Tool):
+    NAME = "cancelled"
+    DESCRIPTION = "Is cancelled while running"
+    
+    def __init__(self):
+        super().__init__(self.NAME, self.DESCRIPTION)
+    
+    async def execute(self) -> dict:
+        raise asyncio.CancelledError
+
+
+def test_execute_tools_propagates_cancellation(tmp_path):
+    manager = ToolManager(str(tmp_path))
+    manager.register_tool(_CancelledTool())
+    
+    results = asyncio.run(manager.execute_tools([("missing", {}), ("missing", {})]))
+    assert [result["success"] for result in results] == [False, False]
+    
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(manager.execute_tools([("missing", {}), ("cancelled", {})]))